@@ -83,7 +83,9 @@ class InteractiveSession:
                 Output.print_error("API key not configured.")
                 return False
 
-            # 创建客户端
+            # 创建客户端（释放旧客户端的连接）
+            if self.client:
+                self.client.close()
             self.client = LLMClient(
                 self.current_model, api_key=api_key, api_url=api_url
             )
@@ -4,9 +4,35 @@
 
 import json
 import os
+import stat
+import tempfile
 from typing import Any, Dict, List, Optional
 
 import yaml
+from yaml.constructor import SafeConstructor
+from yaml.events import (
+    AliasEvent,
+    CollectionEndEvent,
+    CollectionStartEvent,
+    DocumentStartEvent,
+    MappingStartEvent,
+    NodeEvent,
+    ScalarEvent,
+)
+from yaml.resolver import Resolver
+
+try:
+    # 优先使用 LibYAML 的 C 实现（PyYAML 未编译 LibYAML 时回退到纯 Python 实现）
+    from yaml import CSafeDumper as YAMLDumper
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeDumper as YAMLDumper
+    from yaml import SafeLoader as YAMLLoader
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 from aicode.config.constants import DEFAULT_CONFIG_DIR, DEFAULT_CONFIG_FILE
 from aicode.llm.exceptions import (
@@ -21,6 +47,131 @@ from aicode.utils.validators import validate_model_data
 logger = get_logger(__name__)
 
 
+def _dumps_json(data: Any) -> bytes:
+    """序列化为 UTF-8 JSON（缩进 2 空格，优先使用 orjson）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _loads_json(raw: bytes) -> Any:
+    """解析 UTF-8 JSON（优先使用 orjson）"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# 未找到路径时的哨兵值；需要完整解析时的哨兵值
+_NOT_FOUND = object()
+_NEEDS_FULL_LOAD = object()
+
+
+def _skip_yaml_node(start_event, events) -> None:
+    """跳过事件流中的一个节点（含嵌套的集合）"""
+    if not isinstance(start_event, CollectionStartEvent):
+        return
+    depth = 1
+    for event in events:
+        if isinstance(event, CollectionStartEvent):
+            depth += 1
+        elif isinstance(event, CollectionEndEvent):
+            depth -= 1
+            if depth == 0:
+                return
+
+
+def _construct_yaml_scalar(event: ScalarEvent) -> Any:
+    """按 SafeLoader 的规则把标量事件转换为 Python 值"""
+    tag = event.tag
+    if tag is None or tag == "!":
+        tag = Resolver().resolve(yaml.ScalarNode, event.value, event.implicit)
+    node = yaml.ScalarNode(tag, event.value, style=event.style)
+    return SafeConstructor().construct_object(node)
+
+
+def _find_yaml_scalar(stream, keys: List[str]) -> Any:
+    """
+    在 YAML 事件流中查找嵌套键对应的标量值，不构建完整的配置字典
+
+    与 load() + get() 的语义保持一致：键按加载后的标量值比较（`1:` 不匹配
+    "1"），重复的键以最后一个为准，读完整个事件流（格式错误照常报错），
+    多文档交给完整解析报错
+
+    Args:
+        stream: YAML 文件对象
+        keys: 键路径（如 ["global", "api_key"]）
+
+    Returns:
+        标量值；路径不存在返回 _NOT_FOUND；值为集合、别名、遇到合并键或
+        多文档时返回 _NEEDS_FULL_LOAD
+
+    Raises:
+        yaml.YAMLError: YAML 格式错误
+    """
+    events = iter(yaml.parse(stream, Loader=YAMLLoader))
+
+    # 跳过 StreamStart / DocumentStart，定位到根节点
+    node = next((e for e in events if isinstance(e, NodeEvent)), None)
+    if node is None:
+        return _NOT_FOUND
+
+    result = _walk_yaml_node(node, events, keys)
+
+    # 读完剩余事件：文档之后的格式错误照常抛出；再出现文档说明是多文档文件
+    for event in events:
+        if isinstance(event, DocumentStartEvent):
+            return _NEEDS_FULL_LOAD
+    return result
+
+
+def _walk_yaml_node(node, events, keys: List[str]) -> Any:
+    """
+    沿键路径在一个节点内查找（除返回 _NEEDS_FULL_LOAD 外，都会完整消费该节点的事件）
+
+    Args:
+        node: 节点的起始事件
+        events: 事件迭代器
+        keys: 剩余的键路径
+
+    Returns:
+        同 _find_yaml_scalar
+    """
+    if isinstance(node, AliasEvent):
+        return _NEEDS_FULL_LOAD
+
+    if not keys:
+        if isinstance(node, ScalarEvent):
+            return _construct_yaml_scalar(node)
+        _skip_yaml_node(node, events)
+        return _NEEDS_FULL_LOAD
+
+    if not isinstance(node, MappingStartEvent):
+        # 标量或列表上无法继续按键查找（get() 同样返回默认值）
+        _skip_yaml_node(node, events)
+        return _NOT_FOUND
+
+    result = _NOT_FOUND
+    for key_event in events:
+        if isinstance(key_event, CollectionEndEvent):
+            return result
+        if not isinstance(key_event, ScalarEvent):
+            # 别名或集合作为键：交给完整解析（集合键会因不可哈希而报错）
+            return _NEEDS_FULL_LOAD
+        if key_event.value == "<<":
+            # 合并键（<<: *base）可能提供目标键，交给完整解析处理
+            return _NEEDS_FULL_LOAD
+
+        if _construct_yaml_scalar(key_event) == keys[0]:
+            # 重复的键以最后一个为准（与 yaml.load 一致）
+            result = _walk_yaml_node(next(events), events, keys[1:])
+            if result is _NEEDS_FULL_LOAD:
+                return result
+        else:
+            _skip_yaml_node(key_event, events)
+            _skip_yaml_node(next(events), events)
+    return result
+
+
 class ConfigManager:
     """配置文件管理器"""
 
@@ -54,13 +205,14 @@ class ConfigManager:
             raise ConfigFileNotFoundError(f"Config file not found: {self.config_path}")
 
         try:
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                # 根据文件扩展名选择解析器
-                if self.config_path.endswith(".json"):
-                    self.config = json.load(f)
-                else:
-                    # 默认使用YAML
-                    self.config = yaml.safe_load(f) or {}
+            # 根据文件扩展名选择解析器
+            if self.config_path.endswith(".json"):
+                with open(self.config_path, "rb") as f:
+                    self.config = _loads_json(f.read())
+            else:
+                # 默认使用YAML
+                with open(self.config_path, "r", encoding="utf-8") as f:
+                    self.config = yaml.load(f, Loader=YAMLLoader) or {}
 
             logger.info(f"Loaded config from {self.config_path}")
             return self.config
@@ -91,20 +243,43 @@ class ConfigManager:
             os.makedirs(config_dir, exist_ok=True)
             logger.debug(f"Created config directory: {config_dir}")
 
+        # 先写入同目录的临时文件再原子替换：写入中途失败不会留下半个配置文件，
+        # 也不会改动与原文件共享 inode 的其他硬链接
+        # 配置文件可能是符号链接（如 dotfiles 管理），替换其指向的真实文件
+        target_path = os.path.realpath(self.config_path)
+        tmp_path = None
         try:
-            with open(self.config_path, "w", encoding="utf-8") as f:
-                if self.config_path.endswith(".json"):
-                    json.dump(self.config, f, indent=2, ensure_ascii=False)
-                else:
-                    yaml.safe_dump(
-                        self.config, f, default_flow_style=False, allow_unicode=True
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(target_path), prefix=".config-", suffix=".tmp"
+            )
+            if self.config_path.endswith(".json"):
+                with os.fdopen(fd, "wb") as f:
+                    f.write(_dumps_json(self.config))
+            else:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    yaml.dump(
+                        self.config,
+                        f,
+                        Dumper=YAMLDumper,
+                        default_flow_style=False,
+                        allow_unicode=True,
                     )
 
+            # 保留已有文件的权限（新文件沿用 mkstemp 的 0600，配置中可能有 API key）
+            if os.path.exists(target_path):
+                mode = stat.S_IMODE(os.stat(target_path).st_mode)
+                os.chmod(tmp_path, mode)
+            os.replace(tmp_path, target_path)
+            tmp_path = None
+
             logger.info(f"Saved config to {self.config_path}")
 
         except Exception as e:
             logger.error(f"Failed to save config: {e}")
             raise ConfigError(f"Failed to save config: {e}")
+        finally:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -130,6 +305,45 @@ class ConfigManager:
 
         return value if value is not None else default
 
+    def get_path(self, key: str, default: Any = None) -> Any:
+        """
+        直接从配置文件读取单个配置值（不加载完整配置）
+
+        YAML 文件按事件流查找，只构造目标标量，结果与 load() + get() 一致；
+        目标为嵌套结构、路径上有别名/合并键或文件包含多个文档时回退到完整解析。
+        JSON 文件直接完整解析。
+
+        Args:
+            key: 配置键（支持点号分隔的嵌套键，如 'global.api_key'）
+            default: 默认值
+
+        Returns:
+            配置值或默认值
+
+        Raises:
+            ConfigFileNotFoundError: 配置文件不存在
+            InvalidConfigError: 配置文件格式错误
+        """
+        if not os.path.exists(self.config_path):
+            raise ConfigFileNotFoundError(f"Config file not found: {self.config_path}")
+
+        value = _NEEDS_FULL_LOAD
+        if not self.config_path.endswith(".json"):
+            try:
+                with open(self.config_path, "r", encoding="utf-8") as f:
+                    value = _find_yaml_scalar(f, key.split("."))
+            except yaml.YAMLError as e:
+                logger.error(f"Invalid config file format: {e}")
+                raise InvalidConfigError(f"Invalid config file format: {e}")
+
+        if value is _NEEDS_FULL_LOAD:
+            full = ConfigManager(self.config_path)
+            full.load()
+            return full.get(key, default)
+        if value is _NOT_FOUND or value is None:
+            return default
+        return value
+
     def set(self, key: str, value: Any) -> None:
         """
         设置配置值
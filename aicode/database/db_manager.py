@@ -2,40 +2,136 @@
 SQLite数据库管理器
 """
 
+import dataclasses
+import functools
+import json
 import os
 import sqlite3
+import threading
 from contextlib import contextmanager
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from aicode.llm.exceptions import (
     DatabaseError,
     ModelAlreadyExistsError,
     ModelNotFoundError,
+    ValidationError,
+)
+from aicode.models.schema import (
+    BACKFILL_MODEL_SPECIALTIES,
+    CREATE_MODEL_SPECIALTIES,
+    CREATE_MODELS_INDEXES,
+    CREATE_MODELS_TABLE,
+    ModelSchema,
+    row_to_model,
 )
-from aicode.models.schema import CREATE_MODELS_TABLE, ModelSchema, row_to_model
 from aicode.utils.logger import get_logger
 from aicode.utils.validators import validate_model_data
 
 logger = get_logger(__name__)
 
+# 批次行数达到该值时改用 json_each 单语句导入（行数太少时 JSON 序列化开销不划算）
+JSON_EACH_THRESHOLD = 50
+
+# SQLite 单条语句的参数上限（旧版本默认 SQLITE_MAX_VARIABLE_NUMBER=999）
+SQLITE_MAX_VARIABLES = 999
+
+
+@functools.lru_cache(maxsize=32)
+def _multi_row_insert_sql(
+    columns: Tuple[str, ...], row_count: int, or_ignore: bool = False
+) -> str:
+    """
+    生成多行 VALUES 的 INSERT 语句（按列、行数与冲突处理方式缓存）
+
+    Args:
+        columns: 列名
+        row_count: 一条语句插入的行数
+        or_ignore: 是否使用 INSERT OR IGNORE（主键冲突的行直接跳过）
+
+    Returns:
+        str: INSERT [OR IGNORE] INTO models (...) VALUES (?, ...), (?, ...), ...
+    """
+    verb = "INSERT OR IGNORE" if or_ignore else "INSERT"
+    row = "(" + ", ".join(["?"] * len(columns)) + ")"
+    return f"{verb} INTO models ({', '.join(columns)}) VALUES " + ", ".join(
+        [row] * row_count
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _json_each_insert_sql(columns: Tuple[str, ...]) -> str:
+    """
+    生成从 JSON 数组批量插入的语句（INSERT OR IGNORE 跳过已存在的模型）
+
+    Args:
+        columns: 列名（同时也是 JSON 对象的键）
+
+    Returns:
+        str: INSERT OR IGNORE INTO models (...) SELECT ... FROM json_each(?)
+    """
+    extracts = ", ".join(f"json_extract(value, '$.{column}')" for column in columns)
+    return (
+        f"INSERT OR IGNORE INTO models ({', '.join(columns)}) "
+        f"SELECT {extracts} FROM json_each(?)"
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _update_sql(columns: Tuple[str, ...]) -> str:
+    """
+    生成一次更新多列的 UPDATE 语句（按列组合缓存）
+
+    Args:
+        columns: 要更新的列名（调用方排序，保证同一组列得到相同的语句文本）
+
+    Returns:
+        str: UPDATE models SET col1 = ?, ..., updated_at = CURRENT_TIMESTAMP
+        WHERE name = ?
+    """
+    assignments = ", ".join(f"{column} = ?" for column in columns)
+    return (
+        f"UPDATE models SET {assignments}, updated_at = CURRENT_TIMESTAMP "
+        "WHERE name = ?"
+    )
+
 
 class DatabaseManager:
     """SQLite数据库管理器"""
 
+    # 固定的 SQL 文本：sqlite3 按语句文本缓存预编译结果，文本不变才能命中缓存
+    _COLUMNS = tuple(field.name for field in dataclasses.fields(ModelSchema))
+    _SQL_INSERT = _multi_row_insert_sql(_COLUMNS, 1)
+    _BOOL_COLUMNS = tuple(
+        field.name for field in dataclasses.fields(ModelSchema) if field.type is bool
+    )
+    _SQL_SELECT = "SELECT * FROM models WHERE name = ?"
+    _SQL_EXISTS = "SELECT COUNT(*) FROM models WHERE name = ?"
+    _SQL_DELETE = "DELETE FROM models WHERE name = ?"
+    # 可更新字段的白名单（UPDATE 语句只拼接这些列名）
+    _UPDATABLE_COLUMNS = frozenset(_COLUMNS)
+
     def __init__(self, db_path: str):
         """
         初始化数据库管理器
 
         Args:
-            db_path: 数据库文件路径
+            db_path: 数据库文件路径，或 SQLite URI（如
+                "file:aicode?mode=memory&cache=shared"，以 "file:" 开头）
         """
         self.db_path = os.path.expanduser(db_path)
+        self._is_uri = self.db_path.startswith("file:")
         self._ensure_db_directory()
+        # 整个生命周期复用同一个连接（加锁串行化，允许跨线程使用）
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
         self._init_database()
         logger.info(f"Database initialized at {self.db_path}")
 
     def _ensure_db_directory(self):
         """确保数据库目录存在"""
+        if self._is_uri:
+            return
         db_dir = os.path.dirname(self.db_path)
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
@@ -45,32 +141,105 @@ class DatabaseManager:
         """初始化数据库表"""
         try:
             with self.get_connection() as conn:
+                # WAL 模式持久化在数据库文件中，只需设置一次（内存库会忽略）
+                conn.execute("PRAGMA journal_mode=WAL")
                 conn.execute(CREATE_MODELS_TABLE)
+                for statement in CREATE_MODELS_INDEXES:
+                    conn.execute(statement)
+
+                # 专长关联表的触发器和补齐语句依赖 JSON1（SQLite 3.38 起内置）
+                try:
+                    conn.execute("SELECT json_quote('')")
+                except sqlite3.OperationalError:
+                    raise DatabaseError(
+                        "SQLite JSON1 extension is required "
+                        f"(linked SQLite version: {sqlite3.sqlite_version})"
+                    )
+
+                # 专长关联表（旧数据库首次升级时补齐已有模型的专长）
+                is_new = (
+                    conn.execute(
+                        "SELECT 1 FROM sqlite_master "
+                        "WHERE type = 'table' AND name = 'model_specialties'"
+                    ).fetchone()
+                    is None
+                )
+                for statement in CREATE_MODEL_SPECIALTIES:
+                    conn.execute(statement)
+                if is_new:
+                    conn.execute(BACKFILL_MODEL_SPECIALTIES)
                 conn.commit()
                 logger.debug("Database tables initialized")
         except sqlite3.Error as e:
             logger.error(f"Failed to initialize database: {e}")
             raise DatabaseError(f"Failed to initialize database: {e}")
 
+    def _connect(self) -> sqlite3.Connection:
+        """
+        打开持久连接并设置连接级 PRAGMA
+
+        Returns:
+            sqlite3.Connection
+        """
+        conn = sqlite3.connect(
+            self.db_path,
+            uri=self._is_uri,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        self._configure_connection(conn)
+        return conn
+
     @contextmanager
     def get_connection(self):
         """
         获取数据库连接（上下文管理器）
 
+        返回的是持久连接，退出时不会关闭；出错时回滚未提交的事务
+
         Yields:
             sqlite3.Connection
         """
-        conn = None
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            yield conn
-        except sqlite3.Error as e:
-            logger.error(f"Database connection error: {e}")
-            raise DatabaseError(f"Database connection error: {e}")
-        finally:
-            if conn:
-                conn.close()
+        with self._lock:
+            try:
+                if self._conn is None:
+                    self._conn = self._connect()
+                yield self._conn
+            except sqlite3.Error as e:
+                logger.error(f"Database connection error: {e}")
+                self._rollback()
+                raise DatabaseError(f"Database connection error: {e}")
+            except BaseException:
+                self._rollback()
+                raise
+
+    def _rollback(self) -> None:
+        """回滚持久连接上未提交的事务，避免影响后续操作"""
+        if self._conn is not None and self._conn.in_transaction:
+            self._conn.rollback()
+
+    def close(self) -> None:
+        """关闭持久连接（之后再次使用时会自动重新连接）"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def _configure_connection(conn: sqlite3.Connection) -> None:
+        """
+        设置连接级 PRAGMA（连接建立时设置一次）
+
+        Args:
+            conn: 数据库连接
+        """
+        conn.execute("PRAGMA busy_timeout=5000")
+        # WAL 模式下 NORMAL 已能保证一致性，且每次提交不必等待 fsync
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # 负数表示以 KiB 为单位（约 64MB 页缓存）
+        conn.execute("PRAGMA cache_size=-64000")
 
     def insert_model(self, model: ModelSchema) -> None:
         """
@@ -89,18 +258,53 @@ class DatabaseManager:
 
         try:
             data = model.to_dict()
-            columns = ", ".join(data.keys())
-            placeholders = ", ".join(["?" for _ in data])
-            sql = f"INSERT INTO models ({columns}) VALUES ({placeholders})"
 
             with self.get_connection() as conn:
-                conn.execute(sql, list(data.values()))
+                conn.execute(self._SQL_INSERT, list(data.values()))
                 conn.commit()
                 logger.info(f"Inserted model: {model.name}")
         except sqlite3.Error as e:
             logger.error(f"Failed to insert model {model.name}: {e}")
             raise DatabaseError(f"Failed to insert model: {e}")
 
+    def insert_models(self, models: List[ModelSchema]) -> None:
+        """
+        批量插入模型（单个事务，全部成功或全部回滚）
+
+        Args:
+            models: ModelSchema实例列表
+
+        Raises:
+            ModelAlreadyExistsError: 任一模型已存在
+            DatabaseError: 数据库错误
+        """
+        if not models:
+            return
+
+        names = [model.name for model in models]
+        placeholders = ", ".join(["?" for _ in names])
+
+        try:
+            rows = [model.to_dict() for model in models]
+
+            with self.get_connection() as conn:
+                # 检查是否已存在（一次查询）
+                cursor = conn.execute(
+                    f"SELECT name FROM models WHERE name IN ({placeholders})", names
+                )
+                existing = [row[0] for row in cursor.fetchall()]
+                if existing:
+                    raise ModelAlreadyExistsError(
+                        f"Models already exist: {', '.join(existing)}"
+                    )
+
+                conn.executemany(self._SQL_INSERT, [list(row.values()) for row in rows])
+                conn.commit()
+                logger.info(f"Inserted {len(models)} models")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to insert models: {e}")
+            raise DatabaseError(f"Failed to insert models: {e}")
+
     def update_model(self, model_name: str, updates: Dict[str, Any]) -> None:
         """
         更新模型
@@ -111,6 +315,7 @@ class DatabaseManager:
 
         Raises:
             ModelNotFoundError: 模型不存在
+            ValidationError: 包含未知字段或字段值无效
             DatabaseError: 数据库错误
         """
         if not self.model_exists(model_name):
@@ -119,6 +324,10 @@ class DatabaseManager:
         if not updates:
             return
 
+        unknown = [key for key in updates if key not in self._UPDATABLE_COLUMNS]
+        if unknown:
+            raise ValidationError(f"Unknown model fields: {', '.join(unknown)}")
+
         try:
             # 验证更新数据（部分验证）
             # 获取现有模型数据并合并
@@ -127,11 +336,13 @@ class DatabaseManager:
             merged_data.update(updates)
             validate_model_data(merged_data)
 
-            set_clause = ", ".join([f"{key} = ?" for key in updates.keys()])
-            sql = f"UPDATE models SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE name = ?"
+            # 列名排序后语句文本固定，可复用持久连接上的预编译语句缓存
+            columns = tuple(sorted(updates))
+            params = [updates[column] for column in columns]
+            params.append(model_name)
 
             with self.get_connection() as conn:
-                conn.execute(sql, list(updates.values()) + [model_name])
+                conn.execute(_update_sql(columns), params)
                 conn.commit()
                 logger.info(f"Updated model: {model_name}")
         except sqlite3.Error as e:
@@ -153,9 +364,7 @@ class DatabaseManager:
         """
         try:
             with self.get_connection() as conn:
-                cursor = conn.execute(
-                    "SELECT * FROM models WHERE name = ?", (model_name,)
-                )
+                cursor = conn.execute(self._SQL_SELECT, (model_name,))
                 row = cursor.fetchone()
 
                 if row is None:
@@ -183,7 +392,7 @@ class DatabaseManager:
 
         try:
             with self.get_connection() as conn:
-                conn.execute("DELETE FROM models WHERE name = ?", (model_name,))
+                conn.execute(self._SQL_DELETE, (model_name,))
                 conn.commit()
                 logger.info(f"Deleted model: {model_name}")
         except sqlite3.Error as e:
@@ -202,9 +411,7 @@ class DatabaseManager:
         """
         try:
             with self.get_connection() as conn:
-                cursor = conn.execute(
-                    "SELECT COUNT(*) FROM models WHERE name = ?", (model_name,)
-                )
+                cursor = conn.execute(self._SQL_EXISTS, (model_name,))
                 count = cursor.fetchone()[0]
                 return count > 0
         except sqlite3.Error as e:
@@ -256,18 +463,12 @@ class DatabaseManager:
                     params.append(filters["min_code_score"])
 
                 if "specialty" in filters:
-                    # SQLite的LIKE查询
+                    # 通过专长关联表的主键索引查找
                     conditions.append(
-                        "(specialties LIKE ? OR specialties LIKE ? OR specialties LIKE ?)"
-                    )
-                    specialty = filters["specialty"]
-                    params.extend(
-                        [
-                            f"{specialty},%",  # 开头
-                            f"%,{specialty},%",  # 中间
-                            f"%,{specialty}",  # 结尾
-                        ]
+                        "name IN "
+                        "(SELECT name FROM model_specialties WHERE specialty = ?)"
                     )
+                    params.append(filters["specialty"].strip().lower())
 
             sql = "SELECT * FROM models"
             if conditions:
@@ -294,41 +495,179 @@ class DatabaseManager:
         """
         stats = {"imported": 0, "skipped": 0, "errors": 0}
 
+        # 先验证全部数据；已存在（或批次内重复）的模型由 INSERT OR IGNORE 跳过
+        rows: List[Dict[str, Any]] = []
         for model_data in models:
             try:
-                # 验证数据
                 validated = validate_model_data(model_data)
-                model = ModelSchema.from_dict(validated)
-
-                # 检查是否已存在
-                if self.model_exists(model.name):
-                    logger.debug(f"Model {model.name} already exists, skipping")
-                    stats["skipped"] += 1
-                    continue
-
-                # 插入
-                self.insert_model(model)
-                stats["imported"] += 1
-
+                rows.append(ModelSchema.from_dict(validated).to_dict())
             except Exception as e:
                 logger.error(f"Failed to import model: {e}")
                 stats["errors"] += 1
 
+        if not rows:
+            return stats
+
+        try:
+            with self.get_connection() as conn:
+                imported = None
+                failed = 0
+                if len(rows) >= JSON_EACH_THRESHOLD:
+                    imported = self._insert_rows_json_each(conn, rows)
+                if imported is None:
+                    imported, failed = self._insert_rows_values(conn, rows)
+                conn.commit()
+            stats["imported"] += imported
+            stats["errors"] += failed
+            stats["skipped"] += len(rows) - imported - failed
+        except Exception as e:
+            logger.error(f"Failed to import models: {e}")
+            stats["errors"] += len(rows)
+
         logger.info(
             f"Batch import completed: {stats['imported']} imported, "
             f"{stats['skipped']} skipped, {stats['errors']} errors"
         )
         return stats
 
+    @staticmethod
+    def _insert_rows_json_each(
+        conn: sqlite3.Connection, rows: List[Dict[str, Any]]
+    ) -> Optional[int]:
+        """
+        整批数据序列化为一个 JSON 数组，由 SQLite 的 json_each 展开插入
+
+        逐行循环在 SQLite 内部完成，只有一次 Python 到 C 的调用
+
+        Args:
+            conn: 数据库连接（调用方负责提交）
+            rows: 模型数据字典列表（ModelSchema.to_dict() 的结果）
+
+        Returns:
+            Optional[int]: 实际插入的行数；语句失败（如某一行触发约束或触发器错误）
+            时回滚本语句并返回 None，由调用方改用分块/逐行插入定位出错的行
+        """
+        columns = tuple(rows[0].keys())
+
+        # 显式开启事务，保证下面 RELEASE 保存点时不会提前提交
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+
+        conn.execute("SAVEPOINT import_json")
+        try:
+            cursor = conn.execute(_json_each_insert_sql(columns), (json.dumps(rows),))
+        except sqlite3.Error as e:
+            conn.execute("ROLLBACK TO import_json")
+            conn.execute("RELEASE import_json")
+            logger.debug(f"Bulk insert failed, retrying in smaller statements: {e}")
+            return None
+        conn.execute("RELEASE import_json")
+        # rowcount 只统计本语句插入的行（不含触发器写入的专长行）
+        return cursor.rowcount
+
+    @staticmethod
+    def _insert_rows_values(
+        conn: sqlite3.Connection, rows: List[Dict[str, Any]]
+    ) -> Tuple[int, int]:
+        """
+        用多行 INSERT OR IGNORE 语句分块插入（同一事务内）
+
+        某个分块的语句失败时（如约束或触发器报错），回滚该分块并逐行重试，
+        只把出错的行计为错误，其余行照常导入
+
+        Args:
+            conn: 数据库连接（调用方负责提交）
+            rows: 模型数据字典列表（ModelSchema.to_dict() 的结果）
+
+        Returns:
+            Tuple[int, int]: (实际插入的行数, 出错的行数)
+        """
+        columns = tuple(rows[0].keys())
+        values = [list(row.values()) for row in rows]
+        # 每条语句尽量多插几行，同时不超过参数上限
+        chunk_size = max(1, SQLITE_MAX_VARIABLES // len(columns))
+
+        # 显式开启事务，保证下面 RELEASE 保存点时不会提前提交
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+
+        inserted = errors = 0
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start : start + chunk_size]
+            conn.execute("SAVEPOINT import_chunk")
+            try:
+                cursor = conn.execute(
+                    _multi_row_insert_sql(columns, len(chunk), or_ignore=True),
+                    [value for row in chunk for value in row],
+                )
+            except sqlite3.Error as e:
+                conn.execute("ROLLBACK TO import_chunk")
+                conn.execute("RELEASE import_chunk")
+                logger.debug(f"Bulk insert failed, retrying row by row: {e}")
+                chunk_inserted, chunk_errors = DatabaseManager._insert_rows_one_by_one(
+                    conn, columns, chunk
+                )
+                inserted += chunk_inserted
+                errors += chunk_errors
+                continue
+            conn.execute("RELEASE import_chunk")
+            # 被忽略的行不计入 rowcount
+            inserted += cursor.rowcount
+        return inserted, errors
+
+    @staticmethod
+    def _insert_rows_one_by_one(
+        conn: sqlite3.Connection, columns: Tuple[str, ...], values: List[List[Any]]
+    ) -> Tuple[int, int]:
+        """
+        逐行插入，每行使用独立的保存点（出错的行回滚后继续处理后续行）
+
+        Args:
+            conn: 数据库连接（已在事务中，调用方负责提交）
+            columns: 列名
+            values: 每行的列值
+
+        Returns:
+            Tuple[int, int]: (实际插入的行数, 出错的行数)
+        """
+        sql = _multi_row_insert_sql(columns, 1, or_ignore=True)
+        inserted = errors = 0
+        for row in values:
+            conn.execute("SAVEPOINT import_row")
+            try:
+                inserted += conn.execute(sql, row).rowcount
+            except sqlite3.Error as e:
+                conn.execute("ROLLBACK TO import_row")
+                logger.error(f"Failed to import model {row[0]!r}: {e}")
+                errors += 1
+            conn.execute("RELEASE import_row")
+        return inserted, errors
+
     def export_all(self) -> List[Dict[str, Any]]:
         """
         导出所有模型为字典列表
 
+        直接把数据库行转为字典（格式与 ModelSchema.to_dict() 一致），
+        不经过 ModelSchema 实例
+
         Returns:
             List[Dict[str, Any]]: 模型数据列表
         """
-        models = self.list_models()
-        return [model.to_dict() for model in models]
+        columns = ", ".join(self._COLUMNS)
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(f"SELECT {columns} FROM models ORDER BY name")
+                rows = [dict(row) for row in cursor]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to export models: {e}")
+            raise DatabaseError(f"Failed to export models: {e}")
+
+        # SQLite 以 0/1 存储布尔字段
+        for row in rows:
+            for column in self._BOOL_COLUMNS:
+                if row[column] is not None:
+                    row[column] = bool(row[column])
+        return rows
 
     def count_models(self) -> int:
         """
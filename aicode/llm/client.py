@@ -41,8 +41,29 @@ class LLMClient:
             raise APIError("API URL is required")
 
         self.token_manager = TokenManager(model_name=model.name)
+        # 复用的 HTTP 客户端（首次请求时创建，保持 keep-alive 连接）
+        self._http_client = None
         logger.info(f"LLMClient initialized for model: {model.name}")
 
+    def _get_http_client(self):
+        """
+        获取复用的 HTTP 客户端
+
+        Returns:
+            httpx.Client: 共享连接池的客户端
+        """
+        if self._http_client is None:
+            import httpx
+
+            self._http_client = httpx.Client(timeout=60.0)
+        return self._http_client
+
+    def close(self) -> None:
+        """关闭底层 HTTP 连接"""
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+
     def chat(
         self,
         messages: List[Dict[str, str]],
@@ -66,6 +87,102 @@ class LLMClient:
             APIError: API调用失败
             TokenLimitExceededError: Token超限
         """
+        payload = self._build_payload(messages, stream, temperature, max_tokens)
+
+        try:
+            # 这里使用简单的实现，实际应该用 httpx 或 openai SDK
+            response_text = self._make_request(payload)
+            logger.info(f"Received response: {len(response_text)} chars")
+            return response_text
+
+        except Exception as e:
+            logger.error(f"API request failed: {e}")
+            raise APIError(f"Failed to call LLM API: {e}")
+
+    def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        流式发送对话请求，逐块返回响应内容
+
+        Args:
+            messages: 消息列表 [{"role": "user", "content": "..."}]
+            temperature: 温度参数
+            max_tokens: 最大输出token数
+
+        Yields:
+            str: 响应内容片段
+
+        Raises:
+            APIConnectionError: 连接失败
+            APITimeoutError: 请求超时
+            APIError: API错误
+        """
+        import httpx
+
+        payload = self._build_payload(messages, True, temperature, max_tokens)
+
+        try:
+            with self._get_http_client().stream(
+                "POST",
+                f"{self.api_url}/chat/completions",
+                json=payload,
+                headers=self._build_headers(),
+            ) as response:
+                response.raise_for_status()
+
+                # OpenAI 兼容的 SSE 格式：每行 "data: {...}"，以 "data: [DONE]" 结束
+                for line in response.iter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+
+                    chunk = json.loads(data)
+                    choices = chunk.get("choices") or [{}]
+                    content = choices[0].get("delta", {}).get("content")
+                    if content:
+                        yield content
+
+        except httpx.TimeoutException as e:
+            logger.error(f"Request timeout: {e}")
+            raise APITimeoutError(f"Request timed out: {e}")
+        except httpx.ConnectError as e:
+            logger.error(f"Connection failed: {e}")
+            raise APIConnectionError(f"Failed to connect to API: {e}")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error: {e}")
+            raise APIError(f"API returned error: {e.response.status_code}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid stream chunk: {e}")
+            raise APIError(f"Invalid stream chunk: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error: {e}")
+            raise APIError(f"Unexpected error: {e}")
+
+    def _build_payload(
+        self,
+        messages: List[Dict[str, str]],
+        stream: bool,
+        temperature: float,
+        max_tokens: Optional[int],
+    ) -> Dict[str, Any]:
+        """
+        构建请求payload（包含输入token检查与截断）
+
+        Args:
+            messages: 消息列表
+            stream: 是否流式返回
+            temperature: 温度参数
+            max_tokens: 最大输出token数
+
+        Returns:
+            Dict: 请求payload
+        """
         # 计算输入token
         input_text = "\n".join([m["content"] for m in messages])
         input_tokens = self.token_manager.count_tokens(input_text)
@@ -98,18 +215,18 @@ class LLMClient:
             payload["max_tokens"] = self.model.max_output_tokens
 
         logger.debug(
-            f"Sending chat request: {len(messages)} messages, {input_tokens} tokens"
+            f"Built chat request: {len(messages)} messages, {input_tokens} tokens"
         )
 
-        try:
-            # 这里使用简单的实现，实际应该用 httpx 或 openai SDK
-            response_text = self._make_request(payload)
-            logger.info(f"Received response: {len(response_text)} chars")
-            return response_text
+        return payload
 
-        except Exception as e:
-            logger.error(f"API request failed: {e}")
-            raise APIError(f"Failed to call LLM API: {e}")
+    def _build_headers(self) -> Dict[str, str]:
+        """构建请求头"""
+        headers = {"Content-Type": "application/json"}
+        # API key 可选（本地模型如 Ollama 不需要）
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
 
     def _make_request(self, payload: Dict[str, Any]) -> str:
         """
@@ -130,17 +247,11 @@ class LLMClient:
 
         logger.debug("Making HTTP request to LLM API")
 
-        headers = {"Content-Type": "application/json"}
-        # API key 可选（本地模型如 Ollama 不需要）
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-
         try:
-            response = httpx.post(
+            response = self._get_http_client().post(
                 f"{self.api_url}/chat/completions",
                 json=payload,
-                headers=headers,
-                timeout=60.0,
+                headers=self._build_headers(),
             )
             response.raise_for_status()
 
@@ -43,13 +43,16 @@ class CodeEditParser:
     # ```
     # </file_edit>
 
+    # 属性部分整体捕获（允许引号内出现 ">"），再由 ATTR_PATTERN 解析，属性顺序不限
     EDIT_PATTERN = re.compile(
-        r'<file_edit\s+path="([^"]+)"(?:\s+type="([^"]+)")?(?:\s+description="([^"]*)")?\s*>\s*'
+        r'<file_edit\s+((?:[^>"]|"[^"]*")*)>\s*'
         r"```(?:\w+)?\s*\n(.*?)\n```\s*"
         r"</file_edit>",
         re.DOTALL,
     )
 
+    ATTR_PATTERN = re.compile(r'(\w+)="([^"]*)"')
+
     # 污染标签模式（需要清理的内容）
     POLLUTION_PATTERNS = [
         r"<think>.*?</think>",
@@ -58,6 +61,12 @@ class CodeEditParser:
         r"<内部思考>.*?</内部思考>",
     ]
 
+    # 所有污染模式合并为一个正则，单次扫描完成清理
+    POLLUTION_PATTERN = re.compile(
+        "|".join(f"(?:{pattern})" for pattern in POLLUTION_PATTERNS),
+        re.DOTALL | re.IGNORECASE,
+    )
+
     @classmethod
     def parse(cls, text: str, auto_clean: bool = True) -> List[FileEdit]:
         """
@@ -77,10 +86,15 @@ class CodeEditParser:
         edits = []
 
         for match in cls.EDIT_PATTERN.finditer(text):
-            file_path = match.group(1)
-            edit_type = match.group(2) or "modify"
-            description = match.group(3) or ""
-            new_content = match.group(4)
+            attrs = dict(cls.ATTR_PATTERN.findall(match.group(1)))
+            file_path = attrs.get("path")
+            if not file_path:
+                logger.debug("Skipping file_edit block without path attribute")
+                continue
+
+            edit_type = attrs.get("type") or "modify"
+            description = attrs.get("description", "")
+            new_content = match.group(2)
 
             edit = FileEdit(
                 file_path=file_path,
@@ -104,12 +118,9 @@ class CodeEditParser:
         Returns:
             str: 清理后的文本
         """
-        cleaned = text
-        for pattern in cls.POLLUTION_PATTERNS:
-            # 检查是否存在污染
-            if re.search(pattern, cleaned, re.DOTALL | re.IGNORECASE):
-                logger.debug(f"Cleaning pollution pattern: {pattern}")
-                cleaned = re.sub(pattern, "", cleaned, flags=re.DOTALL | re.IGNORECASE)
+        cleaned, count = cls.POLLUTION_PATTERN.subn("", text)
+        if count:
+            logger.debug(f"Cleaned {count} pollution block(s)")
 
         return cleaned
 
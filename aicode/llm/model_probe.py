@@ -34,6 +34,12 @@ Use the <file_edit> format to provide your changes."""
         r"<内部思考>.*?</内部思考>",  # 中文思考标签
     ]
 
+    # 合并后的清理正则（单次扫描）
+    POLLUTION_PATTERN = re.compile(
+        "|".join(f"(?:{pattern})" for pattern in POLLUTION_PATTERNS),
+        re.DOTALL | re.IGNORECASE,
+    )
+
     def __init__(self, model: ModelSchema, api_key: str, api_url: str = None):
         """
         初始化探测器
@@ -154,11 +160,7 @@ Use the <file_edit> format to provide your changes."""
         Returns:
             str: 清理后的文本
         """
-        cleaned = text
-        for pattern in self.POLLUTION_PATTERNS:
-            cleaned = re.sub(pattern, "", cleaned, flags=re.DOTALL | re.IGNORECASE)
-
-        return cleaned
+        return self.POLLUTION_PATTERN.sub("", text)
 
     @staticmethod
     def clean_response(text: str) -> str:
@@ -171,10 +173,7 @@ Use the <file_edit> format to provide your changes."""
         Returns:
             str: 清理后的响应
         """
-        cleaned = text
-        for pattern in ModelProbe.POLLUTION_PATTERNS:
-            cleaned = re.sub(pattern, "", cleaned, flags=re.DOTALL | re.IGNORECASE)
-        return cleaned
+        return ModelProbe.POLLUTION_PATTERN.sub("", text)
 
 
 def probe_model(
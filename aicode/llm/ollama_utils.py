@@ -3,22 +3,89 @@ Ollama 工具函数
 提供 Ollama 模型管理功能
 """
 
-from typing import Dict, List, Optional
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import httpx
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 from aicode.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+
+def _loads_json(raw) -> Any:
+    """解析 JSON（bytes 或 str，优先使用 orjson）"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 # Ollama 默认地址
 OLLAMA_BASE_URL = "http://localhost:11434"
 
+# 默认超时：连接本地服务应当很快，连不上时尽早失败
+OLLAMA_TIMEOUT = httpx.Timeout(10.0, connect=2.0)
+
+# 远端社区 API 的超时：经过公网（DNS、TLS 握手），连接超时不能按本地服务设置
+REMOTE_TIMEOUT = httpx.Timeout(15.0, connect=10.0)
+
+# 共享的 HTTP 客户端（首次使用时创建，跨调用复用 keep-alive 连接）
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+# 可用性检查结果的缓存时间（秒）
+AVAILABILITY_TTL = 5.0
+# base_url -> (检查时间, 是否可用)
+_availability_cache: Dict[str, Tuple[float, bool]] = {}
+
+
+def get_client() -> httpx.Client:
+    """
+    获取模块共享的 HTTP 客户端
+
+    Returns:
+        httpx.Client: 共享连接池的客户端
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    timeout=OLLAMA_TIMEOUT,
+                    limits=httpx.Limits(
+                        max_keepalive_connections=10, keepalive_expiry=30.0
+                    ),
+                )
+    return _client
+
+
+def close_client() -> None:
+    """关闭共享的 HTTP 客户端（下次使用时重新创建）"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def clear_availability_cache() -> None:
+    """清空可用性检查缓存（下次调用 is_ollama_available 时重新探测）"""
+    _availability_cache.clear()
+
 
 def is_ollama_available(base_url: str = OLLAMA_BASE_URL, timeout: float = 2.0) -> bool:
     """
     检查 Ollama 服务是否可用
 
+    结果按 base_url 缓存 AVAILABILITY_TTL 秒，避免每次操作前都发起探测请求
+
     Args:
         base_url: Ollama 服务地址
         timeout: 超时时间（秒）
@@ -26,12 +93,20 @@ def is_ollama_available(base_url: str = OLLAMA_BASE_URL, timeout: float = 2.0) -
     Returns:
         bool: 服务可用返回 True
     """
+    now = time.monotonic()
+    cached = _availability_cache.get(base_url)
+    if cached is not None and now - cached[0] < AVAILABILITY_TTL:
+        return cached[1]
+
     try:
-        response = httpx.get(f"{base_url}/api/tags", timeout=timeout)
-        return response.status_code == 200
+        response = get_client().get(f"{base_url}/api/tags", timeout=timeout)
+        available = response.status_code == 200
     except Exception as e:
         logger.debug(f"Ollama not available: {e}")
-        return False
+        available = False
+
+    _availability_cache[base_url] = (now, available)
+    return available
 
 
 def list_local_models(base_url: str = OLLAMA_BASE_URL) -> List[Dict]:
@@ -47,7 +122,7 @@ def list_local_models(base_url: str = OLLAMA_BASE_URL) -> List[Dict]:
     Raises:
         httpx.HTTPStatusError: API 请求失败
     """
-    response = httpx.get(f"{base_url}/api/tags", timeout=10.0)
+    response = get_client().get(f"{base_url}/api/tags")
     response.raise_for_status()
 
     data = response.json()
@@ -57,6 +132,30 @@ def list_local_models(base_url: str = OLLAMA_BASE_URL) -> List[Dict]:
     return models
 
 
+def _iter_ndjson_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    把字节块切分为 NDJSON 行（不做 UTF-8 解码，跳过空行）
+
+    Args:
+        chunks: 响应字节块（行可能跨块）
+
+    Yields:
+        bytes: 一行 JSON
+    """
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield line
+    # 最后一行可能没有换行符
+    buffer = buffer.strip()
+    if buffer:
+        yield buffer
+
+
 def pull_model(name: str, base_url: str = OLLAMA_BASE_URL) -> None:
     """
     下载模型（流式输出进度）
@@ -70,7 +169,7 @@ def pull_model(name: str, base_url: str = OLLAMA_BASE_URL) -> None:
     """
     logger.info(f"Pulling model: {name}")
 
-    with httpx.stream(
+    with get_client().stream(
         "POST",
         f"{base_url}/api/pull",
         json={"name": name},
@@ -78,26 +177,25 @@ def pull_model(name: str, base_url: str = OLLAMA_BASE_URL) -> None:
     ) as response:
         response.raise_for_status()
 
-        for line in response.iter_lines():
-            if line:
-                # Ollama 返回 JSON 格式的进度信息
-                try:
-                    import json
-
-                    data = json.loads(line)
-                    status = data.get("status", "")
-
-                    # 打印进度
-                    if "total" in data and "completed" in data:
-                        total = data["total"]
-                        completed = data["completed"]
-                        percent = int((completed / total) * 100) if total > 0 else 0
-                        print(f"\r{status}: {percent}%", end="", flush=True)
-                    else:
-                        print(f"\r{status}", end="", flush=True)
-
-                except json.JSONDecodeError:
-                    print(line)
+        # Ollama 返回 NDJSON 格式的进度信息：按字节切行，直接解析 bytes
+        for line in _iter_ndjson_lines(response.iter_bytes(chunk_size=65536)):
+            try:
+                data = _loads_json(line)
+            # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类
+            except json.JSONDecodeError:
+                print(line.decode("utf-8", errors="replace"))
+                continue
+
+            status = data.get("status", "")
+
+            # 打印进度
+            if "total" in data and "completed" in data:
+                total = data["total"]
+                completed = data["completed"]
+                percent = int((completed / total) * 100) if total > 0 else 0
+                print(f"\r{status}: {percent}%", end="", flush=True)
+            else:
+                print(f"\r{status}", end="", flush=True)
 
     print()  # 换行
     logger.info(f"Model {name} pulled successfully")
@@ -116,7 +214,10 @@ def delete_model(name: str, base_url: str = OLLAMA_BASE_URL) -> None:
     """
     logger.info(f"Deleting model: {name}")
 
-    response = httpx.delete(f"{base_url}/api/delete", json={"name": name}, timeout=10.0)
+    # httpx 的 Client.delete() 不支持请求体，需要通过 request() 发送
+    response = get_client().request(
+        "DELETE", f"{base_url}/api/delete", json={"name": name}
+    )
     response.raise_for_status()
 
     logger.info(f"Model {name} deleted successfully")
@@ -136,7 +237,7 @@ def show_model_info(name: str, base_url: str = OLLAMA_BASE_URL) -> Dict:
     Raises:
         httpx.HTTPStatusError: API 请求失败
     """
-    response = httpx.post(f"{base_url}/api/show", json={"name": name}, timeout=10.0)
+    response = get_client().post(f"{base_url}/api/show", json={"name": name})
     response.raise_for_status()
 
     return response.json()
@@ -160,8 +261,8 @@ def list_remote_models(search: Optional[str] = None) -> List[Dict]:
         if search:
             params["search"] = search
 
-        response = httpx.get(
-            "https://ollamadb.dev/api/v1/models", params=params, timeout=10.0
+        response = get_client().get(
+            "https://ollamadb.dev/api/v1/models", params=params, timeout=REMOTE_TIMEOUT
         )
         response.raise_for_status()
 
@@ -174,6 +275,42 @@ def list_remote_models(search: Optional[str] = None) -> List[Dict]:
         return _get_builtin_models(search)
 
 
+# 内置常用模型列表（备用）
+_BUILTIN_MODELS = (
+    {
+        "name": "llama3.3:latest",
+        "size": "42GB",
+        "description": "Meta Llama 3.3",
+    },
+    {"name": "llama3.1:8b", "size": "4.7GB", "description": "Meta Llama 3.1 8B"},
+    {"name": "llama2:13b", "size": "7.3GB", "description": "Meta Llama 2 13B"},
+    {"name": "llama2:7b", "size": "3.8GB", "description": "Meta Llama 2 7B"},
+    {"name": "codellama:7b", "size": "3.8GB", "description": "Code Llama 7B"},
+    {"name": "codellama:13b", "size": "7.3GB", "description": "Code Llama 13B"},
+    {
+        "name": "deepseek-r1:7b",
+        "size": "4.1GB",
+        "description": "DeepSeek R1 7B (reasoning)",
+    },
+    {"name": "gemma2:9b", "size": "5.4GB", "description": "Google Gemma 2 9B"},
+    {"name": "gemma2:2b", "size": "1.6GB", "description": "Google Gemma 2 2B"},
+    {"name": "qwen2.5:7b", "size": "4.4GB", "description": "Alibaba Qwen 2.5 7B"},
+    {
+        "name": "qwen2.5-coder:7b",
+        "size": "4.4GB",
+        "description": "Qwen 2.5 Coder 7B",
+    },
+    {"name": "mistral:7b", "size": "4.1GB", "description": "Mistral 7B"},
+    {"name": "phi4:latest", "size": "8.4GB", "description": "Microsoft Phi-4"},
+)
+
+# 预先计算的小写搜索文本（名称与描述之间用换行分隔，避免跨字段匹配）
+_BUILTIN_SEARCH_BLOBS = tuple(
+    (model, f"{model['name']}\n{model.get('description', '')}".lower())
+    for model in _BUILTIN_MODELS
+)
+
+
 def _get_builtin_models(search: Optional[str] = None) -> List[Dict]:
     """
     获取内置常用模型列表（备用）
@@ -182,47 +319,14 @@ def _get_builtin_models(search: Optional[str] = None) -> List[Dict]:
         search: 搜索关键词（可选）
 
     Returns:
-        List[Dict]: 模型列表
+        List[Dict]: 模型列表（副本，调用方可以修改）
     """
-    models = [
-        {
-            "name": "llama3.3:latest",
-            "size": "42GB",
-            "description": "Meta Llama 3.3",
-        },
-        {"name": "llama3.1:8b", "size": "4.7GB", "description": "Meta Llama 3.1 8B"},
-        {"name": "llama2:13b", "size": "7.3GB", "description": "Meta Llama 2 13B"},
-        {"name": "llama2:7b", "size": "3.8GB", "description": "Meta Llama 2 7B"},
-        {"name": "codellama:7b", "size": "3.8GB", "description": "Code Llama 7B"},
-        {"name": "codellama:13b", "size": "7.3GB", "description": "Code Llama 13B"},
-        {
-            "name": "deepseek-r1:7b",
-            "size": "4.1GB",
-            "description": "DeepSeek R1 7B (reasoning)",
-        },
-        {"name": "gemma2:9b", "size": "5.4GB", "description": "Google Gemma 2 9B"},
-        {"name": "gemma2:2b", "size": "1.6GB", "description": "Google Gemma 2 2B"},
-        {"name": "qwen2.5:7b", "size": "4.4GB", "description": "Alibaba Qwen 2.5 7B"},
-        {
-            "name": "qwen2.5-coder:7b",
-            "size": "4.4GB",
-            "description": "Qwen 2.5 Coder 7B",
-        },
-        {"name": "mistral:7b", "size": "4.1GB", "description": "Mistral 7B"},
-        {"name": "phi4:latest", "size": "8.4GB", "description": "Microsoft Phi-4"},
-    ]
-
     # 如果有搜索关键词，过滤模型
     if search:
         search_lower = search.lower()
-        models = [
-            m
-            for m in models
-            if search_lower in m["name"].lower()
-            or search_lower in m.get("description", "").lower()
-        ]
+        return [dict(m) for m, blob in _BUILTIN_SEARCH_BLOBS if search_lower in blob]
 
-    return models
+    return [dict(m) for m in _BUILTIN_MODELS]
 
 
 def search_models(keyword: str) -> List[Dict]:
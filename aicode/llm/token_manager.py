@@ -2,7 +2,8 @@
 Token计数和管理
 """
 
-from typing import Optional
+import functools
+from typing import NamedTuple, Optional, Tuple
 
 import tiktoken
 
@@ -13,6 +14,14 @@ from aicode.utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+class TokenAnalysis(NamedTuple):
+    """一次编码得到的token统计结果"""
+
+    count: int  # token数量
+    within_limit: bool  # 是否未超过模型限制（无限制时为True）
+    remaining: Optional[int]  # 剩余token数（不小于0），无限制时为None
+
+
 class TokenManager:
     """Token计数和管理器"""
 
@@ -30,6 +39,17 @@ class TokenManager:
         "text-davinci-002": "p50k_base",
     }
 
+    # 每个实例缓存的 token 计数条数（重复的系统提示词等只编码一次）
+    COUNT_CACHE_SIZE = 1024
+    # 超过该字符数的文本不进缓存：不断增长的对话历史几乎不会重复命中，
+    # 缓存它们只会让大段提示词常驻内存
+    COUNT_CACHE_MAX_CHARS = 4096
+
+    # 前缀匹配表：按前缀长度降序，最先匹配到的即为最具体的前缀
+    _MODEL_PREFIXES = tuple(
+        sorted(MODEL_ENCODINGS.items(), key=lambda item: len(item[0]), reverse=True)
+    )
+
     def __init__(
         self, model_name: Optional[str] = None, encoding_name: Optional[str] = None
     ):
@@ -43,18 +63,27 @@ class TokenManager:
         self.model_name = model_name
         self.encoding_name = encoding_name or self._get_encoding_name(model_name)
 
+    @functools.cached_property
+    def encoding(self) -> tiktoken.Encoding:
+        """
+        编码器（首次真正需要编码时才加载）
+
+        Raises:
+            TokenError: 编码器加载失败
+        """
         try:
-            self.encoding = tiktoken.get_encoding(self.encoding_name)
-            logger.debug(
-                f"TokenManager initialized with encoding: {self.encoding_name}"
-            )
+            encoding = tiktoken.get_encoding(self.encoding_name)
+            logger.debug(f"TokenManager loaded encoding: {self.encoding_name}")
+            return encoding
         except Exception as e:
             logger.error(f"Failed to load encoding {self.encoding_name}: {e}")
             raise TokenError(f"Failed to load encoding: {e}")
 
-    def _get_encoding_name(self, model_name: Optional[str]) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _get_encoding_name(model_name: Optional[str]) -> str:
         """
-        根据模型名称获取编码器名称
+        根据模型名称获取编码器名称（结果按模型名缓存）
 
         Args:
             model_name: 模型名称
@@ -63,20 +92,35 @@ class TokenManager:
             编码器名称
         """
         if model_name is None:
-            return self.DEFAULT_ENCODING
+            return TokenManager.DEFAULT_ENCODING
 
         # 精确匹配
-        if model_name in self.MODEL_ENCODINGS:
-            return self.MODEL_ENCODINGS[model_name]
+        if model_name in TokenManager.MODEL_ENCODINGS:
+            return TokenManager.MODEL_ENCODINGS[model_name]
 
         # 前缀匹配
-        for model_prefix, encoding in self.MODEL_ENCODINGS.items():
+        for model_prefix, encoding in TokenManager._MODEL_PREFIXES:
             if model_name.startswith(model_prefix):
                 return encoding
 
         # 默认编码器
         logger.debug(f"Unknown model {model_name}, using default encoding")
-        return self.DEFAULT_ENCODING
+        return TokenManager.DEFAULT_ENCODING
+
+    @functools.cached_property
+    def _count_cached(self):
+        """按文本缓存 token 计数的函数（每个实例独立的 LRU，首次使用时创建）"""
+        return functools.lru_cache(maxsize=self.COUNT_CACHE_SIZE)(self._encode_count)
+
+    def _encode_count(self, text: str) -> int:
+        """编码文本并返回 token 数量（不缓存）"""
+        return len(self.encoding.encode(text))
+
+    def _count(self, text: str) -> int:
+        """计算 token 数量，只缓存不超过 COUNT_CACHE_MAX_CHARS 的短文本"""
+        if len(text) > self.COUNT_CACHE_MAX_CHARS:
+            return self._encode_count(text)
+        return self._count_cached(text)
 
     def count_tokens(self, text: str) -> int:
         """
@@ -92,14 +136,32 @@ class TokenManager:
             return 0
 
         try:
-            tokens = self.encoding.encode(text)
-            count = len(tokens)
+            count = self._count(text)
             logger.debug(f"Counted {count} tokens in text of {len(text)} chars")
             return count
         except Exception as e:
             logger.error(f"Failed to count tokens: {e}")
             raise TokenError(f"Failed to count tokens: {e}")
 
+    def analyze(self, text: str, model: ModelSchema) -> TokenAnalysis:
+        """
+        只编码一次，同时得到token数、是否超限和剩余token数
+
+        Args:
+            text: 文本内容
+            model: 模型Schema
+
+        Returns:
+            TokenAnalysis: (count, within_limit, remaining)
+        """
+        count = self.count_tokens(text)
+        limit = model.get_context_limit()
+
+        if limit is None:
+            return TokenAnalysis(count, True, None)
+
+        return TokenAnalysis(count, count <= limit, max(0, limit - count))
+
     def check_limit(self, text: str, model: ModelSchema) -> bool:
         """
         检查文本是否超过模型的token限制
@@ -114,14 +176,15 @@ class TokenManager:
         Raises:
             TokenLimitExceededError: token超过限制
         """
-        token_count = self.count_tokens(text)
         limit = model.get_context_limit()
 
         if limit is None:
             logger.warning(f"No token limit defined for model {model.name}")
             return True
 
-        if token_count > limit:
+        token_count, within_limit, _ = self.analyze(text, model)
+
+        if not within_limit:
             raise TokenLimitExceededError(
                 f"Token count {token_count} exceeds limit {limit} for model {model.name}"
             )
@@ -140,21 +203,35 @@ class TokenManager:
         Returns:
             截断后的文本
         """
+        return self._truncate_with_count(text, max_tokens)[0]
+
+    def _truncate_with_count(self, text: str, max_tokens: int) -> Tuple[str, int]:
+        """
+        截断文本并返回截断后文本的真实token数
+
+        未超过限制时只编码一次；发生截断时，切口处的 BPE 合并可能变化、
+        不完整的多字节序列会解码为 U+FFFD，因此对结果重新计数（短文本计入缓存，
+        调用方之后再 count_tokens 同一结果不会重复编码）
+
+        Args:
+            text: 文本内容
+            max_tokens: 最大token数量
+
+        Returns:
+            (截断后的文本, 该文本的token数量)
+        """
         if not text or max_tokens <= 0:
-            return ""
+            return "", 0
 
         try:
             tokens = self.encoding.encode(text)
 
             if len(tokens) <= max_tokens:
-                return text
-
-            # 截断并解码
-            truncated_tokens = tokens[:max_tokens]
-            truncated_text = self.encoding.decode(truncated_tokens)
+                return text, len(tokens)
 
+            truncated_text = self.encoding.decode(tokens[:max_tokens])
             logger.debug(f"Truncated text from {len(tokens)} to {max_tokens} tokens")
-            return truncated_text
+            return truncated_text, self._count(truncated_text)
 
         except Exception as e:
             logger.error(f"Failed to truncate text: {e}")
@@ -174,12 +251,12 @@ class TokenManager:
         Returns:
             估算成本（美元），如果模型没有价格信息则返回None
         """
-        input_tokens = self.count_tokens(text)
-
-        # 检查是否有价格信息
+        # 检查是否有价格信息（没有则无需计数）
         if model.cost_per_1k_input is None:
             return None
 
+        input_tokens = self.count_tokens(text)
+
         input_cost = (input_tokens / 1000) * model.cost_per_1k_input
 
         output_cost = 0.0
@@ -208,8 +285,7 @@ class TokenManager:
         if limit is None:
             return None
 
-        used = self.count_tokens(text)
-        remaining = limit - used
+        remaining = self.analyze(text, model).remaining
 
         logger.debug(f"Remaining tokens: {remaining}/{limit}")
-        return max(0, remaining)
+        return remaining
@@ -2,8 +2,9 @@
 数据模型定义
 """
 
-from dataclasses import asdict, dataclass
-from typing import Any, Dict, List, Optional
+import functools
+from dataclasses import asdict, dataclass, fields
+from typing import Any, ClassVar, Dict, FrozenSet, Optional, Tuple
 
 from aicode.config.constants import MAX_SCORE, MIN_SCORE, TOKEN_BUFFER_RATIO
 
@@ -31,6 +32,92 @@ CREATE TABLE IF NOT EXISTS models (
 );
 """
 
+# query_models 筛选列的索引（逐条执行）
+CREATE_MODELS_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_models_provider ON models(provider)",
+    "CREATE INDEX IF NOT EXISTS idx_models_code_score ON models(code_score)",
+)
+
+
+def _specialties_json_sql(column: str) -> str:
+    """
+    生成把逗号分隔的专长字符串转为 JSON 数组的 SQL 表达式
+
+    触发器中不能使用 CTE，借助 json_each 展开为行。json_quote 负责转义
+    （引号、反斜杠、控制字符），其输出中的逗号只可能来自原文，因此把逗号替换为
+    "," 后总是合法的 JSON 数组，任何值都不会导致整行专长丢失
+
+    Args:
+        column: 专长列的表达式（如 NEW.specialties）
+
+    Returns:
+        str: JSON 数组文本的 SQL 表达式
+    """
+    return f"'[' || replace(json_quote({column}), ',', '\",\"') || ']'"
+
+
+# 专长关联表：按专长筛选时走主键索引，不再对 specialties 做 LIKE 扫描
+# 由 models 表上的触发器维护，所有写入路径（含批量导入）自动保持一致
+CREATE_MODEL_SPECIALTIES = (
+    """
+CREATE TABLE IF NOT EXISTS model_specialties (
+    name TEXT NOT NULL,
+    specialty TEXT NOT NULL,
+    PRIMARY KEY (specialty, name)
+) WITHOUT ROWID
+""",
+    "CREATE INDEX IF NOT EXISTS idx_model_specialties_name "
+    "ON model_specialties(name)",
+    f"""
+CREATE TRIGGER IF NOT EXISTS trg_models_specialties_insert
+AFTER INSERT ON models WHEN NEW.specialties IS NOT NULL
+BEGIN
+    INSERT OR IGNORE INTO model_specialties (name, specialty)
+    SELECT NEW.name, lower(trim(value))
+    FROM json_each({_specialties_json_sql("NEW.specialties")})
+    WHERE trim(value) != '';
+END
+""",
+    f"""
+CREATE TRIGGER IF NOT EXISTS trg_models_specialties_update
+AFTER UPDATE OF name, specialties ON models
+BEGIN
+    DELETE FROM model_specialties WHERE name = OLD.name;
+    INSERT OR IGNORE INTO model_specialties (name, specialty)
+    SELECT NEW.name, lower(trim(value))
+    FROM json_each({_specialties_json_sql("NEW.specialties")})
+    WHERE NEW.specialties IS NOT NULL AND trim(value) != '';
+END
+""",
+    """
+CREATE TRIGGER IF NOT EXISTS trg_models_specialties_delete
+AFTER DELETE ON models
+BEGIN
+    DELETE FROM model_specialties WHERE name = OLD.name;
+END
+""",
+)
+
+# 关联表新建时，为已有的模型补齐数据
+BACKFILL_MODEL_SPECIALTIES = f"""
+INSERT OR IGNORE INTO model_specialties (name, specialty)
+SELECT models.name, lower(trim(split.value))
+FROM models, json_each({_specialties_json_sql("models.specialties")}) AS split
+WHERE models.specialties IS NOT NULL AND trim(split.value) != ''
+"""
+
+
+@functools.lru_cache(maxsize=256)
+def _split_specialties(value: str) -> Tuple[str, ...]:
+    """解析逗号分隔的专长字符串（按值缓存，返回不可变元组可安全共享）"""
+    return tuple(s.strip() for s in value.split(",") if s.strip())
+
+
+@functools.lru_cache(maxsize=256)
+def _join_specialties(specialties: Tuple[str, ...]) -> str:
+    """将专长元组序列化为逗号分隔的字符串（按值缓存）"""
+    return ",".join(specialties)
+
 
 @dataclass
 class ModelSchema:
@@ -48,17 +135,27 @@ class ModelSchema:
     speed_score: Optional[float] = None
     cost_per_1k_input: Optional[float] = None
     cost_per_1k_output: Optional[float] = None
-    specialties: Optional[List[str]] = None
+    specialties: Optional[Tuple[str, ...]] = None
     notes: Optional[str] = None
     vscode_friendly: bool = True  # 是否能很好地遵循代码编辑格式要求
     is_local: bool = False  # 是否为本地模型（如 Ollama）
 
+    # 全部字段名（类定义完成后填充），from_dict 据此检查未知的键
+    _FIELD_NAMES: ClassVar[FrozenSet[str]] = frozenset()
+
+    def __post_init__(self):
+        """专长统一存为元组（接受列表或逗号分隔的字符串）"""
+        if isinstance(self.specialties, str):
+            self.specialties = _split_specialties(self.specialties)
+        elif self.specialties is not None and not isinstance(self.specialties, tuple):
+            self.specialties = tuple(self.specialties)
+
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典（用于数据库存储）"""
         data = asdict(self)
-        # 将列表转为逗号分隔的字符串
+        # 将专长元组转为逗号分隔的字符串
         if self.specialties:
-            data["specialties"] = ",".join(self.specialties)
+            data["specialties"] = _join_specialties(self.specialties)
         else:
             data["specialties"] = None
         return data
@@ -66,12 +163,13 @@ class ModelSchema:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "ModelSchema":
         """从字典创建实例（从数据库读取）"""
-        data = data.copy()
-        # 将逗号分隔的字符串转为列表
-        if data.get("specialties") and isinstance(data["specialties"], str):
-            data["specialties"] = [
-                s.strip() for s in data["specialties"].split(",") if s.strip()
-            ]
+        # 与直接 cls(**data) 一致：未知键报错，而不是静默丢弃
+        unknown = data.keys() - cls._FIELD_NAMES
+        if unknown:
+            raise TypeError(
+                f"Unexpected ModelSchema fields: {', '.join(sorted(unknown))}"
+            )
+        # 逗号分隔的专长字符串由 __post_init__ 转为元组
         return cls(**data)
 
     def get_context_limit(self) -> Optional[int]:
@@ -100,6 +198,9 @@ class ModelSchema:
         return True
 
 
+ModelSchema._FIELD_NAMES = frozenset(field.name for field in fields(ModelSchema))
+
+
 def row_to_model(row: Any) -> ModelSchema:
     """
     将数据库行转换为 ModelSchema
@@ -6,7 +6,7 @@ JSON-RPC Server - VSCode 扩展通信后端
 
 import json
 import sys
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from aicode.config.config_manager import ConfigManager
 from aicode.config.constants import DEFAULT_DB_PATH
@@ -101,7 +101,9 @@ class RPCServer:
             if not api_key:
                 raise ConfigError("API key not configured")
 
-            # 创建客户端
+            # 创建客户端（释放旧客户端的连接）
+            if self.client:
+                self.client.close()
             self.client = LLMClient(
                 self.current_model, api_key=api_key, api_url=api_url
             )
@@ -339,6 +341,7 @@ class RPCServer:
     def shutdown(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """关闭服务器"""
         logger.info("Server shutting down")
+        self.db_manager.close()
         return {"success": True}
 
     def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
@@ -351,6 +354,13 @@ class RPCServer:
         Returns:
             Dict: JSON-RPC 响应
         """
+        if not isinstance(request, dict):
+            return {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": -32600, "message": "Invalid Request"},
+            }
+
         method = request.get("method")
         params = request.get("params", {})
         request_id = request.get("id")
@@ -373,6 +383,24 @@ class RPCServer:
                 "error": {"code": -32603, "message": str(e)},
             }
 
+    def handle_batch(self, requests: List[Any]) -> Any:
+        """
+        处理 JSON-RPC 批量请求（按顺序逐个处理）
+
+        Args:
+            requests: JSON-RPC 请求列表
+
+        Returns:
+            List[Dict]: 响应列表（顺序与请求一致）；空批量返回单个错误响应
+        """
+        if not requests:
+            return {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": -32600, "message": "Invalid Request"},
+            }
+        return [self.handle_request(request) for request in requests]
+
     def run(self):
         """运行服务器（stdio 模式）"""
         logger.info("RPC Server starting in stdio mode")
@@ -386,15 +414,20 @@ class RPCServer:
 
                 try:
                     request = json.loads(line)
-                    logger.debug(f"Received request: {request.get('method')}")
 
-                    response = self.handle_request(request)
+                    # 批量请求（JSON 数组）一次读入、一次写回
+                    if isinstance(request, list):
+                        logger.debug(f"Received batch: {len(request)} requests")
+                        response = self.handle_batch(request)
+                    else:
+                        logger.debug(f"Received request: {_method_of(request)}")
+                        response = self.handle_request(request)
 
                     # 发送响应
                     sys.stdout.write(json.dumps(response) + "\n")
                     sys.stdout.flush()
 
-                    logger.debug(f"Sent response for: {request.get('method')}")
+                    logger.debug("Sent response")
 
                 except json.JSONDecodeError as e:
                     logger.error(f"Invalid JSON: {e}")
@@ -414,6 +447,11 @@ class RPCServer:
             logger.info("Server stopped")
 
 
+def _method_of(request: Any) -> Optional[str]:
+    """取出请求的方法名（用于日志）"""
+    return request.get("method") if isinstance(request, dict) else None
+
+
 def main():
     """启动 RPC Server"""
     server = RPCServer()
@@ -7,6 +7,9 @@ from typing import Optional
 
 from aicode.config.constants import DEFAULT_LOG_LEVEL, LOG_DATE_FORMAT, LOG_FORMAT
 
+# 所有 handler 共用同一个 formatter
+_FORMATTER = logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
+
 
 def get_logger(name: str, level: Optional[str] = None) -> logging.Logger:
     """
@@ -34,8 +37,7 @@ def get_logger(name: str, level: Optional[str] = None) -> logging.Logger:
     console_handler.setLevel(getattr(logging, log_level.upper()))
 
     # 设置格式
-    formatter = logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_FORMATTER)
 
     # 添加handler
     logger.addHandler(console_handler)
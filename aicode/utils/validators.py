@@ -7,6 +7,12 @@ from typing import Any, Dict, List, Optional
 from aicode.config.constants import MAX_SCORE, MIN_SCORE, SPECIALTIES
 from aicode.llm.exceptions import ValidationError
 
+# 合法专长集合（成员检查为单次哈希查找）
+_SPECIALTY_SET = frozenset(SPECIALTIES)
+
+# 允许的 URL 协议前缀
+_URL_SCHEMES = ("http://", "https://")
+
 
 def validate_model_name(name: Any) -> str:
     """验证模型名称"""
@@ -107,13 +113,14 @@ def validate_specialties(value: Any) -> Optional[List[str]]:
         # 如果是字符串，尝试分割
         value = [s.strip() for s in value.split(",") if s.strip()]
 
-    if not isinstance(value, list):
+    # ModelSchema.specialties 以元组存储，同样接受
+    if not isinstance(value, (list, tuple)):
         raise ValidationError("Specialties must be a list or comma-separated string")
 
     if not value:
         return None
 
-    validated = []
+    normalized = []
     for item in value:
         if not isinstance(item, str):
             raise ValidationError("Each specialty must be a string")
@@ -122,14 +129,15 @@ def validate_specialties(value: Any) -> Optional[List[str]]:
         if not item:
             continue
 
-        if item not in SPECIALTIES:
+        if item not in _SPECIALTY_SET:
             raise ValidationError(
                 f"Invalid specialty '{item}'. Must be one of: {', '.join(SPECIALTIES)}"
             )
 
-        if item not in validated:
-            validated.append(item)
+        normalized.append(item)
 
+    # 保序去重
+    validated = list(dict.fromkeys(normalized))
     return validated if validated else None
 
 
@@ -145,7 +153,7 @@ def validate_url(value: Any, field_name: str) -> Optional[str]:
     if not value:
         return None
 
-    if not value.startswith(("http://", "https://")):
+    if not value.startswith(_URL_SCHEMES):
         raise ValidationError(f"{field_name} must start with http:// or https://")
 
     if len(value) > 2048:
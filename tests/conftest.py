@@ -3,9 +3,16 @@ Pytest configuration and fixtures
 """
 
 import os
+import sqlite3
+import uuid
 
 import pytest
 
+from aicode.database.db_manager import DatabaseManager
+
+# Shared in-memory SQLite database used by the test session
+TEST_DB_URI = "file:aicode_test?mode=memory&cache=shared"
+
 
 def pytest_configure(config):
     """Register custom markers"""
@@ -28,8 +35,8 @@ def pytest_collection_modifyitems(config, items):
             reason="Network tests skipped (SKIP_NETWORK_TESTS=true)"
         )
         for item in items:
-            # Skip tests in test_token_manager.py as they require network
-            if "test_token_manager" in item.nodeid:
+            # Skip tests that load a real tiktoken encoding (downloads BPE files)
+            if "tiktoken_warmup" in getattr(item, "fixturenames", ()):
                 item.add_marker(skip_marker)
             # Or if explicitly marked as network test
             if "network" in item.keywords:
@@ -40,6 +47,32 @@ def pytest_collection_modifyitems(config, items):
 def setup_test_environment():
     """Setup test environment"""
     # Set environment variables for testing
-    os.environ["AICODE_DB_PATH"] = ":memory:"  # Use in-memory database for tests
+    # Shared-cache in-memory database: every connection sees the same data
+    os.environ["AICODE_DB_PATH"] = TEST_DB_URI
+    # Keep one connection open so the shared database survives between tests
+    keeper = sqlite3.connect(TEST_DB_URI, uri=True)
     yield
     # Cleanup after all tests
+    keeper.close()
+
+
+@pytest.fixture(scope="session")
+def tiktoken_warmup():
+    """Load the default BPE encoding once per session (warms tiktoken's cache)"""
+    import tiktoken
+
+    from aicode.llm.token_manager import TokenManager
+
+    return tiktoken.get_encoding(TokenManager.DEFAULT_ENCODING)
+
+
+@pytest.fixture
+def memory_db():
+    """Isolated in-memory DatabaseManager, discarded after the test"""
+    uri = f"file:aicode_{uuid.uuid4().hex}?mode=memory&cache=shared"
+    # The database lives only while at least one connection is open
+    keeper = sqlite3.connect(uri, uri=True)
+    manager = DatabaseManager(uri)
+    yield manager
+    manager.close()
+    keeper.close()
@@ -0,0 +1,23 @@
+"""
+Integration test configuration
+"""
+
+import socket
+
+# Default Ollama service address
+OLLAMA_HOST = "localhost"
+OLLAMA_PORT = 11434
+
+
+def _probe_ollama(host=OLLAMA_HOST, port=OLLAMA_PORT, timeout=0.2):
+    """Return True if something is listening on the Ollama port (no HTTP request)"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        return sock.connect_ex((host, port)) == 0
+
+
+# Without a running Ollama service the module is never imported,
+# so none of its imports or HTTP probes run
+collect_ignore = []
+if not _probe_ollama():
+    collect_ignore.append("test_ollama_integration.py")
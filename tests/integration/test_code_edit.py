@@ -2,15 +2,12 @@
 """
 测试代码编辑解析功能
 """
-from aicode.llm.code_edit import CodeEditParser, create_inline_edit_prompt
 
+import pytest
 
-def test_parse_single_edit():
-    """测试解析单个编辑"""
-    print("TEST 1: Parse Single Edit")
-    print("=" * 50)
+from aicode.llm.code_edit import CodeEditParser, create_inline_edit_prompt
 
-    text = """
+SINGLE_EDIT_TEXT = """
 Here's the fix:
 
 <file_edit path="src/main.py" type="modify" description="Add error handling">
@@ -27,29 +24,7 @@ def main():
 This should handle errors properly.
 """
 
-    edits = CodeEditParser.parse(text)
-    assert len(edits) == 1, f"Expected 1 edit, got {len(edits)}"
-
-    edit = edits[0]
-    assert edit.file_path == "src/main.py"
-    assert edit.edit_type == "modify"
-    assert edit.description == "Add error handling"
-    assert "try:" in edit.new_content
-    assert "except Exception" in edit.new_content
-
-    print(f"✓ Parsed edit: {edit.file_path}")
-    print(f"  Type: {edit.edit_type}")
-    print(f"  Description: {edit.description}")
-    print(f"  Content lines: {len(edit.new_content.split(chr(10)))}")
-    print()
-
-
-def test_parse_multiple_edits():
-    """测试解析多个编辑"""
-    print("TEST 2: Parse Multiple Edits")
-    print("=" * 50)
-
-    text = """
+MULTIPLE_EDITS_TEXT = """
 I'll help you refactor:
 
 <file_edit path="src/main.py" type="modify" description="Add logging">
@@ -84,22 +59,42 @@ class TestMain(unittest.TestCase):
 Done!
 """
 
-    edits = CodeEditParser.parse(text)
-    assert len(edits) == 3, f"Expected 3 edits, got {len(edits)}"
+# 边界情况
+NO_EDIT_TEXT = "Just a normal response without any code edits."
 
-    print(f"✓ Parsed {len(edits)} edits:")
-    for i, edit in enumerate(edits, 1):
-        print(f"  {i}. {edit.file_path} ({edit.edit_type})")
-        print(f"     → {edit.description}")
-    print()
+MISSING_DESCRIPTION_TEXT = """
+<file_edit path="file.py" type="modify">
+```python
+code
+```
+</file_edit>
+"""
 
+MISSING_TYPE_TEXT = """
+<file_edit path="file.py" description="test">
+```python
+code
+```
+</file_edit>
+"""
 
-def test_format_edits_display():
-    """测试编辑显示格式化"""
-    print("TEST 3: Format Edits for Display")
-    print("=" * 50)
+REORDERED_ATTRS_TEXT = """
+<file_edit description="a > b" type="create" path="file.py">
+```python
+code
+```
+</file_edit>
+"""
 
-    text = """
+MISSING_PATH_TEXT = """
+<file_edit type="modify">
+```python
+code
+```
+</file_edit>
+"""
+
+DISPLAY_EDITS_TEXT = """
 <file_edit path="src/main.py" type="modify" description="Fix bug">
 ```python
 def main():
@@ -114,7 +109,96 @@ import unittest
 </file_edit>
 """
 
+TO_DICT_TEXT = """
+<file_edit path="src/main.py" type="modify" description="Test">
+```python
+print("Hello")
+```
+</file_edit>
+"""
+
+
+# (text, expected_count, expected_attrs)
+PARSE_CASES = (
+    (
+        SINGLE_EDIT_TEXT,
+        1,
+        [
+            {
+                "file_path": "src/main.py",
+                "edit_type": "modify",
+                "description": "Add error handling",
+            }
+        ],
+    ),
+    (
+        MULTIPLE_EDITS_TEXT,
+        3,
+        [
+            {"file_path": "src/main.py", "edit_type": "modify"},
+            {"file_path": "src/config.py", "edit_type": "create"},
+            {"file_path": "tests/test_main.py", "edit_type": "modify"},
+        ],
+    ),
+    (NO_EDIT_TEXT, 0, []),
+    (MISSING_DESCRIPTION_TEXT, 1, [{"description": ""}]),
+    (MISSING_TYPE_TEXT, 1, [{"edit_type": "modify"}]),  # 默认值
+    (
+        REORDERED_ATTRS_TEXT,
+        1,
+        [{"file_path": "file.py", "edit_type": "create", "description": "a > b"}],
+    ),
+    (MISSING_PATH_TEXT, 0, []),
+)
+
+PARSE_CASE_IDS = (
+    "single",
+    "multiple",
+    "no-edit",
+    "missing-description",
+    "missing-type",
+    "reordered-attrs",
+    "missing-path",
+)
+
+
+@pytest.mark.parametrize(
+    "text, expected_count, expected_attrs", PARSE_CASES, ids=PARSE_CASE_IDS
+)
+def test_parse(text, expected_count, expected_attrs):
+    """测试解析编辑（单个、多个及边界情况）"""
     edits = CodeEditParser.parse(text)
+    assert len(edits) == expected_count, f"Expected {expected_count}, got {len(edits)}"
+
+    # 每个编辑的属性收成元组后整体比较，失败时一次给出完整差异
+    actual = [
+        tuple(getattr(edit, key) for key in attrs)
+        for edit, attrs in zip(edits, expected_attrs)
+    ]
+    assert actual == [tuple(attrs.values()) for attrs in expected_attrs]
+
+
+def test_parse_edit_content():
+    """测试解析出的代码内容"""
+    print("TEST 1: Parse Edit Content")
+    print("=" * 50)
+
+    edit = CodeEditParser.parse(SINGLE_EDIT_TEXT)[0]
+    assert "try:" in edit.new_content
+    assert "except Exception" in edit.new_content
+
+    line_count = edit.new_content.count("\n") + 1
+    print(f"✓ Parsed edit: {edit.file_path}")
+    print(f"  Content lines: {line_count}")
+    print()
+
+
+def test_format_edits_display():
+    """测试编辑显示格式化"""
+    print("TEST 2: Format Edits for Display")
+    print("=" * 50)
+
+    edits = CodeEditParser.parse(DISPLAY_EDITS_TEXT)
     formatted = CodeEditParser.format_edits_for_display(edits)
 
     print(formatted)
@@ -129,7 +213,7 @@ import unittest
 
 def test_system_prompt():
     """测试系统提示生成"""
-    print("TEST 4: System Prompt Generation")
+    print("TEST 3: System Prompt Generation")
     print("=" * 50)
 
     prompt = create_inline_edit_prompt()
@@ -147,66 +231,20 @@ def test_system_prompt():
     print()
 
 
-def test_edge_cases():
-    """测试边界情况"""
-    print("TEST 5: Edge Cases")
-    print("=" * 50)
-
-    # 没有编辑
-    text1 = "Just a normal response without any code edits."
-    edits1 = CodeEditParser.parse(text1)
-    assert len(edits1) == 0
-    print("✓ Empty text handled")
-
-    # 缺少 description
-    text2 = """
-<file_edit path="file.py" type="modify">
-```python
-code
-```
-</file_edit>
-"""
-    edits2 = CodeEditParser.parse(text2)
-    assert len(edits2) == 1
-    assert edits2[0].description == ""
-    print("✓ Missing description handled")
-
-    # 缺少 type
-    text3 = """
-<file_edit path="file.py" description="test">
-```python
-code
-```
-</file_edit>
-"""
-    edits3 = CodeEditParser.parse(text3)
-    assert len(edits3) == 1
-    assert edits3[0].edit_type == "modify"  # 默认值
-    print("✓ Missing type defaults to 'modify'")
-
-    print()
-
-
 def test_to_dict():
     """测试转换为字典"""
-    print("TEST 6: Convert to Dict")
+    print("TEST 4: Convert to Dict")
     print("=" * 50)
 
-    text = """
-<file_edit path="src/main.py" type="modify" description="Test">
-```python
-print("Hello")
-```
-</file_edit>
-"""
-
-    edits = CodeEditParser.parse(text)
+    edits = CodeEditParser.parse(TO_DICT_TEXT)
     edit_dict = edits[0].to_dict()
 
-    assert edit_dict["file_path"] == "src/main.py"
-    assert edit_dict["edit_type"] == "modify"
-    assert edit_dict["description"] == "Test"
-    assert edit_dict["new_content"] == 'print("Hello")'
+    assert (
+        edit_dict["file_path"],
+        edit_dict["edit_type"],
+        edit_dict["description"],
+        edit_dict["new_content"],
+    ) == ("src/main.py", "modify", "Test", 'print("Hello")')
 
     print("✓ Dict conversion successful")
     print(f"  Keys: {list(edit_dict.keys())}")
@@ -219,11 +257,12 @@ if __name__ == "__main__":
     print("=" * 50 + "\n")
 
     try:
-        test_parse_single_edit()
-        test_parse_multiple_edits()
+        for case_id, case in zip(PARSE_CASE_IDS, PARSE_CASES):
+            test_parse(*case)
+            print(f"✓ Parse case: {case_id}")
+        test_parse_edit_content()
         test_format_edits_display()
         test_system_prompt()
-        test_edge_cases()
         test_to_dict()
 
         print("=" * 50)
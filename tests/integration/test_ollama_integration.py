@@ -5,6 +5,12 @@ Ollama 集成测试
 如果 Ollama 未运行，测试将被跳过
 """
 
+import functools
+import os
+import sqlite3
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from aicode.config.constants import DEFAULT_DB_PATH
@@ -14,26 +20,81 @@ from aicode.llm.client import LLMClient
 from aicode.models.schema import ModelSchema
 
 
-# 检查 Ollama 是否可用
+# 检查 Ollama 是否可用（收集阶段探测一次，之后复用结果）
+@functools.lru_cache(maxsize=1)
 def is_ollama_running():
     """检查 Ollama 是否运行"""
     return ollama_utils.is_ollama_available()
 
 
-# 如果 Ollama 未运行，跳过所有测试
-pytestmark = pytest.mark.skipif(not is_ollama_running(), reason="Ollama is not running")
+# Ollama 端口未监听时，tests/integration/conftest.py 直接忽略本模块（不会被导入）；
+# 显式指定本文件运行时仍会导入，此时由 skipif 兜底跳过
+# 共享同一个本地 Ollama 服务：并行运行（pytest-xdist）时固定在同一个 worker 上
+pytestmark = [
+    pytest.mark.skipif(not is_ollama_running(), reason="Ollama is not running"),
+    pytest.mark.serial,
+    pytest.mark.xdist_group("ollama"),
+]
+
+# 并发探测的线程数（与 Ollama 服务端并行度保持一致，避免压垮单 GPU 后端）
+OLLAMA_PROBE_WORKERS = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+
+
+@pytest.fixture(scope="session")
+def ollama_probe():
+    """
+    并发执行互不依赖的 Ollama 探测请求，结果在整个测试会话中复用
+
+    每项结果为 (value, error)，由测试通过 _probe_result 取出（出错时重新抛出）
+    """
+    probes = {
+        "available": is_ollama_running,
+        "local_models": ollama_utils.list_local_models,
+        "remote_models": ollama_utils.list_remote_models,
+        "search_llama": lambda: ollama_utils.search_models("llama"),
+    }
+
+    with ThreadPoolExecutor(max_workers=OLLAMA_PROBE_WORKERS) as executor:
+        futures = {key: executor.submit(probe) for key, probe in probes.items()}
+
+    results = {}
+    for key, future in futures.items():
+        error = future.exception()
+        results[key] = (None, error) if error else (future.result(), None)
+    return results
+
+
+def _probe_result(ollama_probe, key):
+    """取出探测结果，探测失败时在当前测试中抛出原异常"""
+    value, error = ollama_probe[key]
+    if error is not None:
+        raise error
+    return value
+
+
+_LLAMA2_7B_FIELDS = {
+    "name": "llama2:7b",
+    "provider": "ollama",
+    "is_local": True,
+    "api_url": "http://localhost:11434/v1",
+}
+
+
+def _llama2_7b():
+    """本地 llama2:7b 模型 Schema（每次调用返回新实例，测试间互不影响）"""
+    return ModelSchema(**_LLAMA2_7B_FIELDS)
 
 
 class TestOllamaService:
     """测试 Ollama 服务基本功能"""
 
-    def test_ollama_is_available(self):
+    def test_ollama_is_available(self, ollama_probe):
         """测试 Ollama 服务可用"""
-        assert ollama_utils.is_ollama_available() is True
+        assert _probe_result(ollama_probe, "available") is True
 
-    def test_list_local_models(self):
+    def test_list_local_models(self, ollama_probe):
         """测试列出本地模型"""
-        models = ollama_utils.list_local_models()
+        models = _probe_result(ollama_probe, "local_models")
 
         # 应该返回列表（可能为空）
         assert isinstance(models, list)
@@ -42,9 +103,9 @@ class TestOllamaService:
         if models:
             assert "name" in models[0]
 
-    def test_list_remote_models(self):
+    def test_list_remote_models(self, ollama_probe):
         """测试列出远端模型"""
-        models = ollama_utils.list_remote_models()
+        models = _probe_result(ollama_probe, "remote_models")
 
         # 应该返回模型列表
         assert isinstance(models, list)
@@ -53,9 +114,9 @@ class TestOllamaService:
         # 检查模型格式
         assert "name" in models[0]
 
-    def test_search_remote_models(self):
+    def test_search_remote_models(self, ollama_probe):
         """测试搜索远端模型"""
-        models = ollama_utils.search_models("llama")
+        models = _probe_result(ollama_probe, "search_llama")
 
         assert isinstance(models, list)
         # 应该至少有一个包含 "llama" 的模型
@@ -129,12 +190,7 @@ class TestOllamaLLMClient:
 
     def test_create_llm_client_without_api_key(self):
         """测试创建不需要 API key 的 LLMClient"""
-        model = ModelSchema(
-            name="llama2:7b",
-            provider="ollama",
-            is_local=True,
-            api_url="http://localhost:11434/v1",
-        )
+        model = _llama2_7b()
 
         # 应该不抛出异常
         client = LLMClient(model)
@@ -177,15 +233,28 @@ class TestOllamaLLMClient:
 class TestOllamaDatabase:
     """测试 Ollama 模型的数据库操作"""
 
-    @pytest.fixture
-    def temp_db(self, tmp_path):
-        """创建临时数据库"""
-        db_path = tmp_path / "test_ollama.db"
-        db = DatabaseManager(str(db_path))
-        yield db
-        # 清理
-        if db_path.exists():
-            db_path.unlink()
+    @pytest.fixture(scope="class")
+    def temp_db(self):
+        """
+        整个测试类共享一个内存数据库（表结构只初始化一次）
+
+        内存数据库的 journal_mode 固定为 MEMORY，且不写磁盘、没有 fsync
+        """
+        uri = f"file:aicode_{uuid.uuid4().hex}?mode=memory&cache=shared"
+        # 至少保留一个打开的连接，内存数据库才会在测试之间保留
+        keeper = sqlite3.connect(uri, uri=True)
+        manager = DatabaseManager(uri)
+        yield manager
+        manager.close()
+        keeper.close()
+
+    @pytest.fixture(autouse=True)
+    def _clean(self, temp_db):
+        """每个测试结束后清空 models 表，测试之间互不影响"""
+        yield
+        with temp_db.get_connection() as conn:
+            conn.execute("DELETE FROM models")
+            conn.commit()
 
     def test_add_ollama_model_to_db(self, temp_db):
         """测试将 Ollama 模型添加到数据库"""
@@ -197,7 +266,7 @@ class TestOllamaDatabase:
             code_score=7.5,
         )
 
-        temp_db.add_model(model)
+        temp_db.insert_model(model)
 
         # 验证已添加
         retrieved = temp_db.get_model("llama2:13b")
@@ -208,22 +277,17 @@ class TestOllamaDatabase:
 
     def test_list_ollama_models_from_db(self, temp_db):
         """测试从数据库列出 Ollama 模型"""
-        # 添加多个模型
-        temp_db.add_model(
-            ModelSchema(
-                name="llama2:7b",
-                provider="ollama",
-                is_local=True,
-                api_url="http://localhost:11434/v1",
-            )
-        )
-        temp_db.add_model(
-            ModelSchema(
-                name="gpt-4",
-                provider="openai",
-                is_local=False,
-                api_url="https://api.openai.com/v1",
-            )
+        # 批量添加多个模型（单个事务）
+        temp_db.insert_models(
+            [
+                _llama2_7b(),
+                ModelSchema(
+                    name="gpt-4",
+                    provider="openai",
+                    is_local=False,
+                    api_url="https://api.openai.com/v1",
+                ),
+            ]
         )
 
         # 列出所有模型
@@ -273,7 +337,7 @@ class TestOllamaEndToEnd:
             is_local=True,
             api_url="http://localhost:11434/v1",
         )
-        db.add_model(model)
+        db.insert_model(model)
 
         # 5. 创建客户端
         client = LLMClient(model)
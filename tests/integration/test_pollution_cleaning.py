@@ -70,13 +70,16 @@ def divide(a, b):
         ("<内部思考>中文思考</内部思考>", "内部思考"),
     ]
 
-    for polluted, tag_name in test_cases:
-        test_text = f'{polluted}\n<file_edit path="test.py">```\ncode\n```</file_edit>'
-        cleaned = CodeEditParser.clean_pollution(test_text)
-        if tag_name in cleaned:
-            print(f"✗ {tag_name} 标签未被清除")
-        else:
-            print(f"✓ {tag_name} 标签已清除")
+    # 所有污染拼成一个文档，只清理一次
+    combined = "\n".join(polluted for polluted, _ in test_cases)
+    combined += '\n<file_edit path="test.py">```\ncode\n```</file_edit>'
+    cleaned = CodeEditParser.clean_pollution(combined)
+
+    remaining = [tag_name for _, tag_name in test_cases if tag_name in cleaned]
+    assert not remaining, f"污染标签未被清除: {remaining}"
+    assert '<file_edit path="test.py">' in cleaned, "正常内容不应被清除"
+    for _, tag_name in test_cases:
+        print(f"✓ {tag_name} 标签已清除")
 
     print()
     print("=" * 60)
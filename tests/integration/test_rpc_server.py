@@ -2,96 +2,183 @@
 """
 测试 RPC Server - 简单的客户端测试脚本
 """
+
+import asyncio
 import json
-import subprocess
 import sys
 import time
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# 等待单个响应的超时时间（秒）
+RESPONSE_TIMEOUT = 5.0
+# 单行响应的最大长度（StreamReader 默认 64KB，模型列表可能更长）
+STREAM_LIMIT = 1024 * 1024
+
+
+def _encode(payload) -> bytes:
+    """编码为一行 UTF-8 JSON（优先使用 orjson，直接产出 bytes）"""
+    if orjson is not None:
+        return orjson.dumps(payload) + b"\n"
+    return json.dumps(payload).encode("utf-8") + b"\n"
+
+
+def _decode(line: bytes):
+    """解码一行 JSON（orjson 直接解析 bytes，无需先解码为 str）"""
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
 
 class RPCTestClient:
-    """简单的 RPC 测试客户端"""
+    """简单的 RPC 测试客户端（asyncio 子进程，二进制 stdio）"""
 
     def __init__(self):
         self.request_id = 0
         self.process = None
 
-    def start_server(self):
+    async def start_server(self):
         """启动 RPC server"""
         print("Starting RPC server...")
-        self.process = subprocess.Popen(
-            [sys.executable, "-m", "aicode.cli.main", "server", "--mode", "stdio"],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "aicode.cli.main",
+            "server",
+            "--mode",
+            "stdio",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            # 不读取 stderr，避免日志写满管道后阻塞服务器
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=STREAM_LIMIT,
         )
-        time.sleep(1)  # 等待服务器启动
+        await asyncio.sleep(1)  # 等待服务器启动
         print("Server started")
 
-    def send_request(self, method: str, params: dict = None) -> dict:
-        """发送 RPC 请求"""
-        if not self.process:
-            raise RuntimeError("Server not started")
-
+    def _build_request(self, method: str, params: dict = None) -> dict:
+        """构建 RPC 请求（分配新的请求 id）"""
         self.request_id += 1
-        request = {
+        return {
             "jsonrpc": "2.0",
             "id": self.request_id,
             "method": method,
             "params": params or {},
         }
 
+    async def _write(self, payload) -> None:
+        """写入一行 JSON"""
+        if not self.process:
+            raise RuntimeError("Server not started")
+        self.process.stdin.write(_encode(payload))
+        await self.process.stdin.drain()
+
+    async def send_request(self, method: str, params: dict = None) -> dict:
+        """发送 RPC 请求"""
+        request = self._build_request(method, params)
+
         # 发送请求
-        request_line = json.dumps(request) + "\n"
         print(f"\n>>> Sending: {method}")
         print(f"    Request: {request}")
-        self.process.stdin.write(request_line)
-        self.process.stdin.flush()
-
-        # 读取响应（跳过空行和非JSON行）
-        max_attempts = 10
-        for attempt in range(max_attempts):
-            response_line = self.process.stdout.readline()
-            if not response_line:
-                time.sleep(0.5)
-                continue
+        await self._write(request)
+        return await self._read_response()
+
+    async def send_batch(self, calls: list) -> list:
+        """
+        发送 JSON-RPC 批量请求（一次往返）
+
+        Args:
+            calls: [(method, params), ...]
+
+        Returns:
+            list: 与 calls 顺序一致的响应列表
+        """
+        requests = [self._build_request(method, params) for method, params in calls]
+
+        print(f"\n>>> Sending batch: {[r['method'] for r in requests]}")
+        await self._write(requests)
+        responses = await self._read_response()
+        if not isinstance(responses, list):
+            raise RuntimeError(f"Expected batch response, got: {responses}")
+
+        # 规范允许批量响应乱序，按 id 对齐
+        by_id = {response.get("id"): response for response in responses}
+        return [by_id[request["id"]] for request in requests]
+
+    async def _read_response(self):
+        """读取一个 JSON 响应（跳过空行和非JSON行）"""
+        deadline = time.monotonic() + RESPONSE_TIMEOUT
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                response_line = await asyncio.wait_for(
+                    self.process.stdout.readuntil(b"\n"), timeout=max(remaining, 0)
+                )
+            except asyncio.TimeoutError:
+                raise RuntimeError("No valid response from server")
+            except asyncio.IncompleteReadError:
+                raise RuntimeError("Server closed stdout")
 
             response_line = response_line.strip()
             if not response_line:
                 continue
 
             try:
-                response = json.loads(response_line)
+                # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类
+                response = _decode(response_line)
                 print(f"<<< Response: {json.dumps(response, indent=2)}")
                 return response
             except json.JSONDecodeError:
-                print(f"    Skipping non-JSON line: {response_line[:100]}")
+                print(f"    Skipping non-JSON line: {response_line[:100]!r}")
                 continue
 
-        raise RuntimeError("No valid response from server")
-
-    def stop_server(self):
+    async def stop_server(self):
         """停止服务器"""
         if self.process:
+            # 测试服务器没有需要落盘的状态，直接 kill，省去 shutdown 往返
+            if self.process.returncode is None:
+                self.process.kill()
             try:
-                self.send_request("shutdown")
-            except:
+                await asyncio.wait_for(self.process.wait(), timeout=1)
+            except asyncio.TimeoutError:
                 pass
-            self.process.terminate()
-            self.process.wait(timeout=5)
             print("\nServer stopped")
 
-    def run_tests(self):
+    async def run_tests(self):
         """运行测试"""
         try:
-            self.start_server()
+            await self.start_server()
+
+            # 六个请求互不依赖输入，一次批量发送，服务器按顺序执行
+            (
+                init_response,
+                models_response,
+                config_response,
+                chat_response,
+                history_response,
+                clear_response,
+            ) = await self.send_batch(
+                [
+                    ("initialize", {"model": "gpt-4"}),
+                    ("getModels", None),
+                    ("getConfig", {"key": "global.default_model"}),
+                    (
+                        "chat",
+                        {"message": "Hello, AI!", "context": [], "temperature": 0.7},
+                    ),
+                    ("getHistory", None),
+                    ("clearHistory", None),
+                ]
+            )
 
             # 测试 1: 初始化
             print("\n" + "=" * 50)
             print("TEST 1: Initialize")
             print("=" * 50)
-            response = self.send_request("initialize", {"model": "gpt-4"})
+            response = init_response
             assert response["result"]["success"], "Initialize failed"
             print("✓ Initialize successful")
 
@@ -99,7 +186,7 @@ class RPCTestClient:
             print("\n" + "=" * 50)
             print("TEST 2: Get Models")
             print("=" * 50)
-            response = self.send_request("getModels")
+            response = models_response
             assert response["result"]["success"], "Get models failed"
             models = response["result"]["models"]
             print(f"✓ Found {len(models)} model(s)")
@@ -110,7 +197,7 @@ class RPCTestClient:
             print("\n" + "=" * 50)
             print("TEST 3: Get Config")
             print("=" * 50)
-            response = self.send_request("getConfig", {"key": "global.default_model"})
+            response = config_response
             assert response["result"]["success"], "Get config failed"
             print(f"✓ Default model: {response['result']['value']}")
 
@@ -118,9 +205,7 @@ class RPCTestClient:
             print("\n" + "=" * 50)
             print("TEST 4: Chat")
             print("=" * 50)
-            response = self.send_request(
-                "chat", {"message": "Hello, AI!", "context": [], "temperature": 0.7}
-            )
+            response = chat_response
             if response["result"]["success"]:
                 print(f"✓ Chat successful")
                 print(f"  Response: {response['result']['response'][:100]}...")
@@ -134,7 +219,7 @@ class RPCTestClient:
             print("\n" + "=" * 50)
             print("TEST 5: Get History")
             print("=" * 50)
-            response = self.send_request("getHistory")
+            response = history_response
             assert response["result"]["success"], "Get history failed"
             messages = response["result"]["messages"]
             print(f"✓ Found {len(messages)} message(s) in history")
@@ -143,7 +228,7 @@ class RPCTestClient:
             print("\n" + "=" * 50)
             print("TEST 6: Clear History")
             print("=" * 50)
-            response = self.send_request("clearHistory")
+            response = clear_response
             assert response["result"]["success"], "Clear history failed"
             print("✓ History cleared")
 
@@ -157,9 +242,9 @@ class RPCTestClient:
 
             traceback.print_exc()
         finally:
-            self.stop_server()
+            await self.stop_server()
 
 
 if __name__ == "__main__":
     client = RPCTestClient()
-    client.run_tests()
+    asyncio.run(client.run_tests())
@@ -0,0 +1,152 @@
+"""
+LLMClient 单元测试（流式对话）
+"""
+
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from aicode.llm.client import LLMClient
+from aicode.llm.exceptions import APIConnectionError, APIError
+from aicode.models.schema import ModelSchema
+
+pytestmark = pytest.mark.unit
+
+API_URL = "https://api.example.com/v1"
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+def _sse(*chunks):
+    """把若干数据块编码为 OpenAI 兼容的 SSE 响应体"""
+    lines = []
+    for chunk in chunks:
+        data = chunk if isinstance(chunk, str) else json.dumps(chunk)
+        lines.append(f"data: {data}\n\n")
+    return "".join(lines).encode("utf-8")
+
+
+def _delta(content):
+    """构造一个包含增量内容的数据块"""
+    return {"choices": [{"delta": {"content": content}}]}
+
+
+@pytest.fixture
+def make_client():
+    """创建挂在 httpx.MockTransport 上的 LLMClient（不加载 tiktoken）"""
+    clients = []
+
+    def _make(handler):
+        model = ModelSchema(
+            name="test-model", provider="test", api_key="sk-test", api_url=API_URL
+        )
+        client = LLMClient(model)
+        # 按单词计数的假编码器，避免测试依赖 tiktoken 下载编码文件
+        client.token_manager.encoding = SimpleNamespace(
+            encode=lambda text: text.split(), decode=lambda ids: " ".join(ids)
+        )
+        client._http_client = httpx.Client(transport=httpx.MockTransport(handler))
+        clients.append(client)
+        return client
+
+    yield _make
+    for client in clients:
+        client.close()
+
+
+def _respond(status=200, content=b""):
+    """返回固定响应的 MockTransport 处理函数，并记录收到的请求"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(status, content=content)
+
+    handler.requests = requests
+    return handler
+
+
+class TestStreamChat:
+    """测试流式对话"""
+
+    def test_yields_content_chunks(self, make_client):
+        """应该按顺序返回每个数据块的增量内容"""
+        handler = _respond(content=_sse(_delta("Hel"), _delta("lo"), "[DONE]"))
+        client = make_client(handler)
+
+        assert list(client.stream_chat(MESSAGES)) == ["Hel", "lo"]
+
+        request = handler.requests[0]
+        assert request.url == f"{API_URL}/chat/completions"
+        assert request.headers["Authorization"] == "Bearer sk-test"
+        assert json.loads(request.content)["stream"] is True
+
+    def test_skips_non_data_lines_and_empty_deltas(self, make_client):
+        """非 data 行、空内容和缺少 choices 的数据块应该被跳过"""
+        body = (
+            b": keep-alive\n\n"
+            + _sse(_delta(""), {"choices": []}, {}, _delta("ok"))
+            + b"event: ping\n\n"
+        )
+        client = make_client(_respond(content=body))
+
+        assert list(client.stream_chat(MESSAGES)) == ["ok"]
+
+    def test_stops_at_done(self, make_client):
+        """遇到 [DONE] 后应该停止读取"""
+        body = _sse(_delta("a"), "[DONE]", _delta("ignored"))
+        client = make_client(_respond(content=body))
+
+        assert list(client.stream_chat(MESSAGES)) == ["a"]
+
+    def test_http_error_status(self, make_client):
+        """HTTP 错误状态应该转换为 APIError"""
+        client = make_client(_respond(status=500))
+
+        with pytest.raises(APIError, match="500"):
+            list(client.stream_chat(MESSAGES))
+
+    def test_invalid_json_chunk(self, make_client):
+        """无法解析的数据块应该转换为 APIError"""
+        client = make_client(_respond(content=_sse("{not json")))
+
+        with pytest.raises(APIError, match="Invalid stream chunk"):
+            list(client.stream_chat(MESSAGES))
+
+    @pytest.mark.parametrize(
+        "chunk",
+        [
+            pytest.param({"choices": [{"delta": None}]}, id="null-delta"),
+            pytest.param({"choices": "oops"}, id="non-list-choices"),
+        ],
+    )
+    def test_malformed_chunk(self, make_client, chunk):
+        """结构不符合预期的数据块应该转换为 APIError"""
+        client = make_client(_respond(content=_sse(chunk)))
+
+        with pytest.raises(APIError, match="Unexpected error"):
+            list(client.stream_chat(MESSAGES))
+
+    def test_connect_error(self, make_client):
+        """连接失败应该转换为 APIConnectionError"""
+
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        client = make_client(handler)
+
+        with pytest.raises(APIConnectionError):
+            list(client.stream_chat(MESSAGES))
+
+    def test_other_transport_error(self, make_client):
+        """其他传输层异常（如 ReadError）也应该转换为 APIError"""
+
+        def handler(request):
+            raise httpx.ReadError("connection reset", request=request)
+
+        client = make_client(handler)
+
+        with pytest.raises(APIError, match="connection reset"):
+            list(client.stream_chat(MESSAGES))
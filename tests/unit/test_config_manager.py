@@ -2,14 +2,16 @@
 测试配置管理器
 """
 
+import copy
 import json
 import os
-import tempfile
+import shutil
+import stat
 
 import pytest
 import yaml
 
-from aicode.config.config_manager import ConfigManager
+from aicode.config.config_manager import ConfigManager, YAMLDumper, YAMLLoader
 from aicode.llm.exceptions import (
     ConfigError,
     ConfigFileNotFoundError,
@@ -17,37 +19,50 @@ from aicode.llm.exceptions import (
 )
 
 
+@pytest.fixture(scope="session")
+def base_config():
+    """基础配置字典（整个会话共享，使用时需深拷贝）"""
+    return {
+        "global": {"api_key": "sk-test", "api_url": "https://api.openai.com/v1"},
+        "models": [{"name": "gpt-4", "provider": "openai", "code_score": 9.0}],
+    }
+
+
+@pytest.fixture(scope="session")
+def gold_config_yaml(base_config, tmp_path_factory):
+    """基准YAML配置文件（整个会话只写一次）"""
+    config_path = tmp_path_factory.mktemp("config") / "gold.yaml"
+    with open(config_path, "w", encoding="utf-8") as f:
+        yaml.dump(base_config, f, Dumper=YAMLDumper)
+    return config_path
+
+
 @pytest.fixture
-def temp_config_yaml():
-    """临时YAML配置文件"""
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-        config = {
-            "global": {"api_key": "sk-test", "api_url": "https://api.openai.com/v1"},
-            "models": [{"name": "gpt-4", "provider": "openai", "code_score": 9.0}],
-        }
-        yaml.safe_dump(config, f)
-        config_path = f.name
-    yield config_path
-    if os.path.exists(config_path):
-        os.unlink(config_path)
+def temp_config_yaml(gold_config_yaml, tmp_path):
+    """临时YAML配置文件（硬链接到基准文件，save() 原子替换不会影响基准文件）"""
+    config_path = tmp_path / "config.yaml"
+    try:
+        os.link(gold_config_yaml, config_path)
+    except OSError:
+        # 不支持硬链接的文件系统退回到复制
+        shutil.copyfile(gold_config_yaml, config_path)
+    return str(config_path)
 
 
 @pytest.fixture
-def temp_config_json():
+def temp_config_json(tmp_path):
     """临时JSON配置文件"""
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-        config = {"global": {"api_key": "sk-test"}}
-        json.dump(config, f)
-        config_path = f.name
-    yield config_path
-    if os.path.exists(config_path):
-        os.unlink(config_path)
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"global": {"api_key": "sk-test"}}))
+    return str(config_path)
 
 
 @pytest.fixture
-def config_manager(temp_config_yaml):
-    """配置管理器fixture"""
-    return ConfigManager(temp_config_yaml)
+def config_manager(temp_config_yaml, base_config):
+    """配置管理器fixture（预置配置，无需重新解析YAML）"""
+    cm = ConfigManager(temp_config_yaml)
+    cm.config = copy.deepcopy(base_config)
+    return cm
 
 
 class TestConfigManager:
@@ -77,45 +92,112 @@ class TestConfigManager:
         config = cm.load()
         assert "global" in config
 
+    def test_load_repeated_returns_copy(self, temp_config_yaml):
+        """重复加载应该返回与之前结果互不影响的配置"""
+        cm = ConfigManager(temp_config_yaml)
+        first = cm.load()
+        first["global"]["api_key"] = "changed"
+
+        second = cm.load()
+        assert second["global"]["api_key"] == "sk-test"
+
+    def test_load_after_same_size_rewrite(self, tmp_path):
+        """原地改写为相同大小且保留 mtime 后应该重新解析"""
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text("api_key: aaaa\n")
+        cm = ConfigManager(str(config_path))
+        assert cm.load() == {"api_key": "aaaa"}
+
+        old_stat = os.stat(config_path)
+        with open(config_path, "r+", encoding="utf-8") as f:
+            f.write("api_key: bbbb\n")
+        os.utime(config_path, ns=(old_stat.st_atime_ns, old_stat.st_mtime_ns))
+
+        assert cm.load() == {"api_key": "bbbb"}
+
+    def test_load_after_file_change(self, tmp_path):
+        """文件修改后应该重新解析"""
+        config_path = str(tmp_path / "config.yaml")
+        cm = ConfigManager(config_path)
+        cm.save({"a": 1})
+        assert cm.load() == {"a": 1}
+
+        cm.save({"a": 1, "b": 2})
+        assert cm.load() == {"a": 1, "b": 2}
+
+    def test_save_does_not_touch_hardlinks(self, temp_config_yaml, gold_config_yaml):
+        """保存应该替换文件而不是原地写入（不影响硬链接的其他路径）"""
+        cm = ConfigManager(temp_config_yaml)
+        cm.save({"changed": True})
+
+        assert ConfigManager(temp_config_yaml).load() == {"changed": True}
+        assert "global" in ConfigManager(str(gold_config_yaml)).load()
+
+    def test_save_preserves_mode(self, tmp_path):
+        """保存应该保留已有文件的权限"""
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text("a: 1\n")
+        os.chmod(config_path, 0o640)
+
+        ConfigManager(str(config_path)).save({"a": 2})
+        assert stat.S_IMODE(os.stat(config_path).st_mode) == 0o640
+        assert os.listdir(tmp_path) == ["config.yaml"]
+
+    def test_save_through_symlink(self, tmp_path):
+        """通过符号链接保存应该更新目标文件并保留链接"""
+        target = tmp_path / "real.yaml"
+        target.write_text("a: 1\n")
+        link = tmp_path / "config.yaml"
+        link.symlink_to(target)
+
+        ConfigManager(str(link)).save({"a": 2})
+        assert link.is_symlink()
+        assert ConfigManager(str(target)).load() == {"a": 2}
+
     def test_load_nonexistent_file(self):
         """加载不存在的文件应该报错"""
         cm = ConfigManager("/nonexistent/config.yaml")
         with pytest.raises(ConfigFileNotFoundError):
             cm.load()
 
-    def test_save_yaml(self):
+    def test_save_yaml(self, tmp_path):
         """应该能保存YAML配置"""
-        with tempfile.NamedTemporaryFile(suffix=".yaml", delete=False) as f:
-            config_path = f.name
-
-        try:
-            cm = ConfigManager(config_path)
-            cm.save({"test": "value"})
-            assert os.path.exists(config_path)
-
-            # 验证保存的内容
-            with open(config_path) as f:
-                loaded = yaml.safe_load(f)
-            assert loaded["test"] == "value"
-        finally:
-            if os.path.exists(config_path):
-                os.unlink(config_path)
-
-    def test_save_json(self):
+        config_path = str(tmp_path / "config.yaml")
+        cm = ConfigManager(config_path)
+        cm.save({"test": "value"})
+        assert os.path.exists(config_path)
+
+        # 验证保存的内容
+        with open(config_path) as f:
+            loaded = yaml.load(f, Loader=YAMLLoader)
+        assert loaded["test"] == "value"
+
+    def test_save_json(self, tmp_path):
         """应该能保存JSON配置"""
-        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
-            config_path = f.name
+        config_path = str(tmp_path / "config.json")
+        cm = ConfigManager(config_path)
+        cm.save({"test": "value"})
 
-        try:
-            cm = ConfigManager(config_path)
-            cm.save({"test": "value"})
+        with open(config_path) as f:
+            loaded = json.load(f)
+        assert loaded["test"] == "value"
+
+    def test_load_invalid_json(self, tmp_path):
+        """格式错误的JSON应该报错"""
+        config_path = tmp_path / "config.json"
+        config_path.write_text("{invalid")
+
+        cm = ConfigManager(str(config_path))
+        with pytest.raises(InvalidConfigError):
+            cm.load()
 
-            with open(config_path) as f:
-                loaded = json.load(f)
-            assert loaded["test"] == "value"
-        finally:
-            if os.path.exists(config_path):
-                os.unlink(config_path)
+    def test_save_json_unicode(self, tmp_path):
+        """保存JSON应该保留非ASCII字符"""
+        config_path = tmp_path / "config.json"
+        cm = ConfigManager(str(config_path))
+        cm.save({"name": "模型"})
+
+        assert "模型" in config_path.read_text(encoding="utf-8")
 
     def test_config_exists(self, temp_config_yaml):
         """应该能检查配置文件是否存在"""
@@ -131,55 +213,162 @@ class TestConfigGetSet:
 
     def test_get_simple_key(self, config_manager):
         """应该能获取简单键"""
-        config_manager.load()
         value = config_manager.get("global")
         assert value is not None
         assert "api_key" in value
 
     def test_get_nested_key(self, config_manager):
         """应该能获取嵌套键"""
-        config_manager.load()
         value = config_manager.get("global.api_key")
         assert value == "sk-test"
 
     def test_get_nonexistent_key(self, config_manager):
         """获取不存在的键应该返回默认值"""
-        config_manager.load()
         value = config_manager.get("nonexistent", "default")
         assert value == "default"
 
     def test_set_simple_key(self, config_manager):
         """应该能设置简单键"""
-        config_manager.load()
         config_manager.set("new_key", "new_value")
         assert config_manager.get("new_key") == "new_value"
 
     def test_set_nested_key(self, config_manager):
         """应该能设置嵌套键"""
-        config_manager.load()
         config_manager.set("global.new_field", "value")
         assert config_manager.get("global.new_field") == "value"
 
     def test_get_global_config(self, config_manager):
         """应该能获取全局配置"""
-        config_manager.load()
         global_config = config_manager.get_global_config()
         assert "api_key" in global_config
 
     def test_get_models_config(self, config_manager):
         """应该能获取模型配置列表"""
-        config_manager.load()
         models = config_manager.get_models_config()
         assert isinstance(models, list)
         assert len(models) > 0
 
 
+GET_PATH_YAML = """
+global:
+  api_key: sk-test
+  timeout: 30
+  debug: true
+  proxy: null
+  quoted: "123"
+  headers:
+    X-Test: a
+models:
+  - name: gpt-4
+    provider: openai
+shared: &anchor
+  nested: 1
+alias: *anchor
+merged:
+  <<: *anchor
+  own: 2
+"""
+
+
+class TestConfigGetPath:
+    """测试按路径直接读取配置"""
+
+    @pytest.fixture
+    def yaml_path(self, tmp_path):
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(GET_PATH_YAML, encoding="utf-8")
+        return str(config_path)
+
+    @pytest.mark.parametrize(
+        "key, expected",
+        [
+            ("global.api_key", "sk-test"),
+            ("global.timeout", 30),
+            ("global.debug", True),
+            ("global.quoted", "123"),
+            ("global.headers", {"X-Test": "a"}),
+            ("models", [{"name": "gpt-4", "provider": "openai"}]),
+            ("alias.nested", 1),
+            ("merged.nested", 1),
+            ("merged.own", 2),
+        ],
+    )
+    def test_get_path(self, yaml_path, key, expected):
+        """应该返回与完整加载后 get() 相同的值"""
+        cm = ConfigManager(yaml_path)
+        assert cm.get_path(key) == expected
+        cm.load()
+        assert cm.get(key) == expected
+
+    @pytest.mark.parametrize(
+        "key", ["global.proxy", "global.missing", "missing", "global.api_key.x"]
+    )
+    def test_get_path_default(self, yaml_path, key):
+        """路径不存在或值为空时应该返回默认值"""
+        cm = ConfigManager(yaml_path)
+        assert cm.get_path(key, "default") == "default"
+
+    @pytest.mark.parametrize(
+        "text, key, expected",
+        [
+            pytest.param("1: one\n", "1", None, id="int-key"),
+            pytest.param("'1': one\n", "1", "one", id="quoted-int-key"),
+            pytest.param("a: first\na: second\n", "a", "second", id="duplicate-key"),
+            pytest.param(
+                "g:\n  x: 1\ng:\n  y: 2\n", "g.x", None, id="duplicate-mapping"
+            ),
+        ],
+    )
+    def test_get_path_loader_semantics(self, tmp_path, text, key, expected):
+        """键比较、重复键应该与 load() + get() 一致"""
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(text, encoding="utf-8")
+        cm = ConfigManager(str(config_path))
+        assert cm.get_path(key) == expected
+        cm.load()
+        assert cm.get(key) == expected
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            pytest.param("a: 1\n---\na: 2\n", id="multi-document"),
+            pytest.param("a: 1\nb: [unclosed\n", id="malformed-after-key"),
+            pytest.param("? [k]\n: v\na: 1\n", id="unhashable-key"),
+        ],
+    )
+    def test_get_path_invalid_file(self, tmp_path, text):
+        """load() 会报错的文件，按路径读取同样应该报错"""
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(text, encoding="utf-8")
+        cm = ConfigManager(str(config_path))
+        with pytest.raises(InvalidConfigError):
+            cm.load()
+        with pytest.raises(InvalidConfigError):
+            cm.get_path("a")
+
+    def test_get_path_does_not_load(self, yaml_path):
+        """按路径读取不应该修改当前配置"""
+        cm = ConfigManager(yaml_path)
+        cm.get_path("global.api_key")
+        assert cm.config == {}
+
+    def test_get_path_json(self, temp_config_json):
+        """JSON配置应该回退到完整解析"""
+        cm = ConfigManager(temp_config_json)
+        assert cm.get_path("global.api_key") == "sk-test"
+
+    def test_get_path_nonexistent_file(self):
+        """文件不存在应该报错"""
+        cm = ConfigManager("/nonexistent/config.yaml")
+        with pytest.raises(ConfigFileNotFoundError):
+            cm.get_path("global.api_key")
+
+
 class TestConfigValidation:
     """测试配置验证"""
 
     def test_validate_valid_config(self, config_manager):
         """有效配置应该验证通过"""
-        config_manager.load()
         assert config_manager.validate_config()
 
     def test_validate_empty_config(self):
@@ -229,7 +418,6 @@ class TestConfigImport:
 
     def test_import_models(self, config_manager):
         """应该能从配置导入模型"""
-        config_manager.load()
         models = config_manager.import_models()
         assert len(models) > 0
         assert models[0].name == "gpt-4"
@@ -278,14 +466,13 @@ class TestConfigMerge:
 class TestDefaultConfig:
     """测试默认配置"""
 
-    def test_create_default_config(self):
+    def test_create_default_config(self, tmp_path):
         """应该能创建默认配置"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config_path = os.path.join(tmpdir, "config.yaml")
-            cm = ConfigManager(config_path)
-            cm.create_default_config()
-
-            assert os.path.exists(config_path)
-            cm.load()
-            assert "global" in cm.config
-            assert "models" in cm.config
+        config_path = str(tmp_path / "config.yaml")
+        cm = ConfigManager(config_path)
+        cm.create_default_config()
+
+        assert os.path.exists(config_path)
+        cm.load()
+        assert "global" in cm.config
+        assert "models" in cm.config
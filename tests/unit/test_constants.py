@@ -4,84 +4,86 @@
 
 import pytest
 
-from aicode.config.constants import (
-    DEFAULT_API_URL,
-    DEFAULT_CONFIG_DIR,
-    DEFAULT_CONFIG_FILE,
-    DEFAULT_DB_NAME,
-    DEFAULT_DB_PATH,
-    DEFAULT_LOG_LEVEL,
-    DEFAULT_MAX_TOKENS,
-    DEFAULT_TIMEOUT,
-    LOG_DATE_FORMAT,
-    LOG_FORMAT,
-    MAX_SCORE,
-    MIN_SCORE,
-    PROJECT_NAME,
-    SPECIALTIES,
-    TOKEN_BUFFER_RATIO,
-    VERSION,
+from aicode.config import constants
+
+# (常量名, 期望值)：取值固定的常量统一由参数化测试比较
+CONSTANT_VALUES = [
+    # 项目名称应该是 aicode
+    ("PROJECT_NAME", "aicode"),
+    # 数据库配置应该正确
+    ("DEFAULT_DB_NAME", "aicode.db"),
+    # 配置路径应该正确
+    ("DEFAULT_CONFIG_DIR", "~/.aicode"),
+    ("DEFAULT_CONFIG_FILE", "config.yaml"),
+    # Token配置应该合理
+    ("TOKEN_BUFFER_RATIO", 0.9),
+    # 评分范围应该正确
+    ("MIN_SCORE", 0.0),
+    ("MAX_SCORE", 10.0),
+]
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    CONSTANT_VALUES,
+    ids=[name for name, _ in CONSTANT_VALUES],
 )
+def test_constant_value(name, expected):
+    """常量值应该符合预期"""
+    assert getattr(constants, name) == expected
+
+
+def test_version():
+    """版本号应该存在"""
+    assert isinstance(constants.VERSION, str)
+    assert constants.VERSION
+
+
+def test_default_db_path():
+    """默认数据库路径应该位于配置目录下"""
+    assert constants.DEFAULT_DB_PATH.endswith("aicode.db")
+    assert "~/.aicode" in constants.DEFAULT_DB_PATH
+
+
+def test_token_config():
+    """Token配置应该合理"""
+    assert constants.DEFAULT_MAX_TOKENS > 0
+    assert 0 < constants.TOKEN_BUFFER_RATIO < 1
+
+
+def test_api_config():
+    """API配置应该正确"""
+    assert constants.DEFAULT_API_URL.startswith("https://")
+    assert isinstance(constants.DEFAULT_TIMEOUT, int)
+    assert constants.DEFAULT_TIMEOUT > 0
+
+
+def test_log_config():
+    """日志配置应该正确"""
+    assert "%(asctime)s" in constants.LOG_FORMAT
+    assert "%(levelname)s" in constants.LOG_FORMAT
+    assert constants.DEFAULT_LOG_LEVEL in [
+        "DEBUG",
+        "INFO",
+        "WARNING",
+        "ERROR",
+        "CRITICAL",
+    ]
+
+
+def test_score_range():
+    """评分下限应该小于上限"""
+    assert constants.MIN_SCORE < constants.MAX_SCORE
+
+
+def test_specialties_contains_expected():
+    """专长列表应该包含预期值"""
+    assert isinstance(constants.SPECIALTIES, list)
+    assert {"code", "reasoning", "chat"} <= set(constants.SPECIALTIES)
 
 
-class TestConstants:
-    """测试常量值"""
-
-    def test_version_exists(self):
-        """版本号应该存在"""
-        assert VERSION is not None
-        assert isinstance(VERSION, str)
-        assert len(VERSION) > 0
-
-    def test_project_name(self):
-        """项目名称应该是 aicode"""
-        assert PROJECT_NAME == "aicode"
-
-    def test_database_config(self):
-        """数据库配置应该正确"""
-        assert DEFAULT_DB_NAME == "aicode.db"
-        assert DEFAULT_DB_PATH.endswith("aicode.db")
-        assert "~/.aicode" in DEFAULT_DB_PATH
-
-    def test_config_paths(self):
-        """配置路径应该正确"""
-        assert DEFAULT_CONFIG_DIR == "~/.aicode"
-        assert DEFAULT_CONFIG_FILE == "config.yaml"
-
-    def test_token_config(self):
-        """Token配置应该合理"""
-        assert DEFAULT_MAX_TOKENS > 0
-        assert 0 < TOKEN_BUFFER_RATIO < 1
-        assert TOKEN_BUFFER_RATIO == 0.9
-
-    def test_api_config(self):
-        """API配置应该正确"""
-        assert DEFAULT_API_URL.startswith("https://")
-        assert DEFAULT_TIMEOUT > 0
-        assert isinstance(DEFAULT_TIMEOUT, int)
-
-    def test_log_config(self):
-        """日志配置应该正确"""
-        assert "%(asctime)s" in LOG_FORMAT
-        assert "%(levelname)s" in LOG_FORMAT
-        assert DEFAULT_LOG_LEVEL in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-
-    def test_score_range(self):
-        """评分范围应该正确"""
-        assert MIN_SCORE == 0.0
-        assert MAX_SCORE == 10.0
-        assert MIN_SCORE < MAX_SCORE
-
-    def test_specialties_list(self):
-        """专长列表应该包含预期值"""
-        assert isinstance(SPECIALTIES, list)
-        assert len(SPECIALTIES) > 0
-        assert "code" in SPECIALTIES
-        assert "reasoning" in SPECIALTIES
-        assert "chat" in SPECIALTIES
-
-    def test_all_specialties_are_strings(self):
-        """所有专长应该是字符串"""
-        for specialty in SPECIALTIES:
-            assert isinstance(specialty, str)
-            assert len(specialty) > 0
+def test_specialties_are_non_empty_strings():
+    """专长应该都是非空字符串"""
+    for specialty in constants.SPECIALTIES:
+        assert isinstance(specialty, str)
+        assert specialty
@@ -2,34 +2,24 @@
 测试数据库管理器
 """
 
-import os
-import tempfile
+import sqlite3
 
 import pytest
 
-from aicode.database.db_manager import DatabaseManager
+from aicode.database.db_manager import JSON_EACH_THRESHOLD, DatabaseManager
 from aicode.llm.exceptions import (
     DatabaseError,
     ModelAlreadyExistsError,
     ModelNotFoundError,
+    ValidationError,
 )
-from aicode.models.schema import ModelSchema
+from aicode.models.schema import CREATE_MODELS_TABLE, ModelSchema
 
 
 @pytest.fixture
-def temp_db():
-    """临时数据库fixture"""
-    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-        db_path = f.name
-    yield db_path
-    if os.path.exists(db_path):
-        os.unlink(db_path)
-
-
-@pytest.fixture
-def db_manager(temp_db):
-    """数据库管理器fixture"""
-    return DatabaseManager(temp_db)
+def db_manager(memory_db):
+    """数据库管理器fixture（每个测试独立的内存数据库，不写磁盘）"""
+    return memory_db
 
 
 @pytest.fixture
@@ -43,10 +33,23 @@ def sample_model():
 class TestDatabaseManager:
     """测试DatabaseManager基本功能"""
 
-    def test_init_creates_database(self, temp_db):
+    def test_init_creates_database(self, tmp_path):
         """初始化应该创建数据库文件"""
-        db = DatabaseManager(temp_db)
-        assert os.path.exists(temp_db)
+        db_path = tmp_path / "aicode.db"
+        db = DatabaseManager(str(db_path))
+        db.close()
+        assert db_path.exists()
+
+    def test_init_with_memory_uri(self):
+        """应该支持共享内存数据库URI（跨连接保留数据）"""
+        uri = "file:test_db_manager_uri?mode=memory&cache=shared"
+        keeper = sqlite3.connect(uri, uri=True)
+        try:
+            db = DatabaseManager(uri)
+            db.insert_model(ModelSchema(name="gpt-4", provider="openai"))
+            assert db.model_exists("gpt-4")
+        finally:
+            keeper.close()
 
     def test_init_creates_tables(self, db_manager):
         """初始化应该创建表"""
@@ -56,6 +59,30 @@ class TestDatabaseManager:
             )
             assert cursor.fetchone() is not None
 
+    def test_get_connection_reuses_connection(self, db_manager):
+        """多次获取应该复用同一个持久连接"""
+        with db_manager.get_connection() as first:
+            pass
+        with db_manager.get_connection() as second:
+            pass
+        assert first is second
+
+    def test_close_reconnects_on_next_use(self, db_manager, sample_model):
+        """关闭后再次使用应该自动重新连接"""
+        db_manager.insert_model(sample_model)
+        db_manager.close()
+        assert db_manager.model_exists("gpt-4")
+
+    def test_failed_statement_rolls_back(self, db_manager, sample_model):
+        """出错时应该回滚未提交的事务，不影响后续操作"""
+        with pytest.raises(DatabaseError):
+            with db_manager.get_connection() as conn:
+                conn.execute("INSERT INTO models (name, provider) VALUES ('x', 'y')")
+                conn.execute("INSERT INTO models (name) VALUES ('z')")
+        assert not db_manager.model_exists("x")
+        db_manager.insert_model(sample_model)
+        assert db_manager.count_models() == 1
+
     def test_insert_model(self, db_manager, sample_model):
         """应该能插入模型"""
         db_manager.insert_model(sample_model)
@@ -87,6 +114,41 @@ class TestDatabaseManager:
         updated = db_manager.get_model("gpt-4")
         assert updated.code_score == 9.5
 
+    def test_update_multiple_fields(self, db_manager, sample_model):
+        """应该能一次更新多个字段"""
+        db_manager.insert_model(sample_model)
+        db_manager.update_model("gpt-4", {"code_score": 9.5, "notes": "updated"})
+        updated = db_manager.get_model("gpt-4")
+        assert (updated.code_score, updated.notes) == (9.5, "updated")
+
+    def test_update_multiple_fields_single_statement(self, db_manager, sample_model):
+        """多字段更新（含改名）应该只执行一条 UPDATE 语句"""
+        db_manager.insert_model(sample_model)
+        statements = []
+        with db_manager.get_connection() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            db_manager.update_model(
+                "gpt-4", {"name": "gpt-4o", "specialties": "chat", "notes": "renamed"}
+            )
+        finally:
+            with db_manager.get_connection() as conn:
+                conn.set_trace_callback(None)
+
+        # 触发器执行时 trace 会重复报告外层语句，按文本去重
+        assert len({sql for sql in statements if sql.startswith("UPDATE models")}) == 1
+        updated = db_manager.get_model("gpt-4o")
+        assert (updated.specialties, updated.notes) == (("chat",), "renamed")
+        assert [m.name for m in db_manager.query_models({"specialty": "chat"})] == [
+            "gpt-4o"
+        ]
+
+    def test_update_unknown_field(self, db_manager, sample_model):
+        """更新未知字段应该报错（不会拼接进SQL）"""
+        db_manager.insert_model(sample_model)
+        with pytest.raises(ValidationError):
+            db_manager.update_model("gpt-4", {"name = 'x' --": 1})
+
     def test_update_nonexistent_model(self, db_manager):
         """更新不存在的模型应该报错"""
         with pytest.raises(ModelNotFoundError):
@@ -174,6 +236,22 @@ class TestQueryModels:
         assert len(models) == 1
         assert models[0].name == "gpt-4"
 
+    def test_query_by_provider_uses_index(self, db_manager):
+        """按提供商筛选应该走索引而不是全表扫描"""
+        with db_manager.get_connection() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM models WHERE provider = ?",
+                ("openai",),
+            ).fetchall()
+            indexes = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                )
+            }
+        assert "USING INDEX idx_models_provider" in " ".join(row[3] for row in plan)
+        assert {"idx_models_provider", "idx_models_code_score"} <= indexes
+
     def test_query_by_specialty(self, db_manager):
         """应该能按专长筛选"""
         model1 = ModelSchema(
@@ -187,6 +265,76 @@ class TestQueryModels:
         assert len(models) == 1
         assert models[0].name == "gpt-4"
 
+    def test_query_by_single_specialty(self, db_manager):
+        """只有一个专长的模型也应该能被筛选出来"""
+        db_manager.insert_model(
+            ModelSchema(name="coder", provider="ollama", specialties=["code"])
+        )
+
+        models = db_manager.query_models({"specialty": "code"})
+        assert [m.name for m in models] == ["coder"]
+
+    def test_query_by_specialty_after_update_and_delete(self, db_manager):
+        """更新或删除模型后，按专长筛选应该保持一致"""
+        db_manager.insert_model(
+            ModelSchema(name="gpt-4", provider="openai", specialties=["code"])
+        )
+        db_manager.insert_model(
+            ModelSchema(name="gpt-3.5", provider="openai", specialties=["code"])
+        )
+        db_manager.update_model("gpt-4", {"specialties": "chat"})
+        db_manager.delete_model("gpt-3.5")
+
+        assert db_manager.query_models({"specialty": "code"}) == []
+        assert [m.name for m in db_manager.query_models({"specialty": "chat"})] == [
+            "gpt-4"
+        ]
+
+    def test_specialties_backfilled_for_existing_database(self, tmp_path):
+        """旧数据库升级时应该为已有模型补齐专长关联"""
+        db_path = str(tmp_path / "old.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute(CREATE_MODELS_TABLE)
+        conn.execute(
+            "INSERT INTO models (name, provider, specialties) "
+            "VALUES ('gpt-4', 'openai', 'code,reasoning')"
+        )
+        conn.commit()
+        conn.close()
+
+        db = DatabaseManager(db_path)
+        try:
+            models = db.query_models({"specialty": "reasoning"})
+            assert [m.name for m in models] == ["gpt-4"]
+        finally:
+            db.close()
+
+    def test_specialties_with_special_characters(self, db_manager):
+        """含引号、反斜杠或控制字符的专长不应该导致同一行的其他专长丢失"""
+        with db_manager.get_connection() as conn:
+            conn.execute(
+                "INSERT INTO models (name, provider, specialties) VALUES (?, ?, ?)",
+                ("gpt-4", "openai", 'code,say "hi"\\\n\x01,chat'),
+            )
+            specialties = conn.execute(
+                "SELECT specialty FROM model_specialties WHERE name = 'gpt-4'"
+            ).fetchall()
+        assert sorted(row[0] for row in specialties) == [
+            "chat",
+            "code",
+            'say "hi"\\\n\x01',
+        ]
+
+    def test_query_by_specialty_uses_index(self, db_manager):
+        """按专长筛选应该走关联表主键索引"""
+        with db_manager.get_connection() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT name FROM model_specialties "
+                "WHERE specialty = ?",
+                ("code",),
+            ).fetchall()
+        assert "USING PRIMARY KEY" in " ".join(row[3] for row in plan)
+
 
 class TestBatchOperations:
     """测试批量操作"""
@@ -202,6 +350,28 @@ class TestBatchOperations:
         assert stats["skipped"] == 0
         assert stats["errors"] == 0
 
+    def test_insert_models(self, db_manager):
+        """应该能在一个事务中批量插入模型"""
+        db_manager.insert_models(
+            [
+                ModelSchema(name="gpt-4", provider="openai"),
+                ModelSchema(name="claude-3", provider="anthropic"),
+            ]
+        )
+        assert db_manager.count_models() == 2
+
+    def test_insert_models_rolls_back_on_duplicate(self, db_manager, sample_model):
+        """批量插入包含已存在模型时应该整体失败"""
+        db_manager.insert_model(sample_model)
+        with pytest.raises(ModelAlreadyExistsError):
+            db_manager.insert_models(
+                [
+                    ModelSchema(name="claude-3", provider="anthropic"),
+                    ModelSchema(name="gpt-4", provider="openai"),
+                ]
+            )
+        assert db_manager.count_models() == 1
+
     def test_import_batch_with_duplicates(self, db_manager):
         """批量导入重复模型应该跳过"""
         model1 = ModelSchema(name="gpt-4", provider="openai")
@@ -215,6 +385,47 @@ class TestBatchOperations:
         assert stats["imported"] == 1
         assert stats["skipped"] == 1
 
+    def test_import_batch_duplicate_within_batch(self, db_manager):
+        """同一批次内重复的模型只导入一次"""
+        models = [
+            {"name": "gpt-4", "provider": "openai"},
+            {"name": "gpt-4", "provider": "openai"},
+        ]
+        stats = db_manager.import_batch(models)
+        assert stats == {"imported": 1, "skipped": 1, "errors": 0}
+        assert db_manager.count_models() == 1
+
+    def test_import_batch_spans_multiple_statements(self, db_manager):
+        """超过单条语句参数上限的批次应该分块插入"""
+        models = [{"name": f"model-{i}", "provider": "test"} for i in range(150)]
+        stats = db_manager.import_batch(models)
+        assert stats["imported"] == 150
+        assert db_manager.count_models() == 150
+
+    def test_import_batch_json_each_preserves_fields(self, db_manager):
+        """大批次走 json_each 导入时字段值应该保持不变"""
+        models = [
+            {
+                "name": f"model-{i}",
+                "provider": "test",
+                "code_score": 7.5,
+                "max_input_tokens": 8192,
+                "specialties": ["code", "chat"],
+            }
+            for i in range(60)
+        ]
+        db_manager.insert_model(ModelSchema(name="model-0", provider="test"))
+
+        stats = db_manager.import_batch(models)
+        assert stats == {"imported": 59, "skipped": 1, "errors": 0}
+
+        model = db_manager.get_model("model-42")
+        assert (model.code_score, model.max_input_tokens, model.specialties) == (
+            7.5,
+            8192,
+            ("code", "chat"),
+        )
+
     def test_import_batch_with_errors(self, db_manager):
         """批量导入包含错误数据应该统计错误"""
         models = [
@@ -225,6 +436,25 @@ class TestBatchOperations:
         assert stats["imported"] == 1
         assert stats["errors"] == 1
 
+    @pytest.mark.parametrize(
+        "count", [3, JSON_EACH_THRESHOLD + 10], ids=["values", "json-each"]
+    )
+    def test_import_batch_isolates_failing_rows(self, db_manager, count):
+        """批量插入中单行出错时只计该行为错误，其余行照常导入"""
+        with db_manager.get_connection() as conn:
+            conn.execute(
+                "CREATE TEMP TRIGGER reject_bad BEFORE INSERT ON models "
+                "WHEN NEW.name = 'bad' BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+            )
+        models = [{"name": f"model-{i}", "provider": "test"} for i in range(count)]
+        models[1] = {"name": "bad", "provider": "test"}
+        db_manager.insert_model(ModelSchema(name="model-0", provider="test"))
+
+        stats = db_manager.import_batch(models)
+        assert stats == {"imported": count - 2, "skipped": 1, "errors": 1}
+        assert db_manager.count_models() == count - 1
+        assert not db_manager.model_exists("bad")
+
     def test_export_all(self, db_manager):
         """应该能导出所有模型"""
         model1 = ModelSchema(name="gpt-4", provider="openai")
@@ -235,3 +465,16 @@ class TestBatchOperations:
         exported = db_manager.export_all()
         assert len(exported) == 2
         assert all(isinstance(m, dict) for m in exported)
+
+    def test_export_all_matches_to_dict(self, db_manager):
+        """导出的字典应该与 ModelSchema.to_dict() 一致"""
+        model = ModelSchema(
+            name="llama3",
+            provider="ollama",
+            code_score=8.0,
+            specialties=["code", "chat"],
+            is_local=True,
+        )
+        db_manager.insert_model(model)
+
+        assert db_manager.export_all() == [model.to_dict()]
@@ -8,95 +8,115 @@ import pytest
 
 from aicode.utils.logger import get_logger
 
+# 本模块创建的 logger 名称前缀（模块结束时统一清理）
+PREFIX = "test_logger_"
+
+# 共享 logger 名称 -> 日志级别（None 表示默认级别）
+LOGGER_LEVELS = {
+    "default": None,
+    "debug": "DEBUG",
+    "warning": "WARNING",
+    "error": "ERROR",
+    "lowercase": "debug",
+}
+
+
+@pytest.fixture(scope="module")
+def loggers():
+    """整个模块共享一组预先配置好的 logger，结束后从 logging 全局表中移除"""
+    yield {
+        key: get_logger(PREFIX + key, level=level)
+        for key, level in LOGGER_LEVELS.items()
+    }
+
+    registry = logging.Logger.manager.loggerDict
+    for name in [name for name in registry if name.startswith(PREFIX)]:
+        logger = registry.pop(name)
+        for handler in getattr(logger, "handlers", [])[:]:
+            logger.removeHandler(handler)
+            handler.close()
+
 
 class TestLogger:
     """测试日志功能"""
 
-    def test_get_logger_returns_logger(self):
+    def test_get_logger_returns_logger(self, loggers):
         """get_logger应该返回Logger实例"""
-        logger = get_logger("test")
-        assert isinstance(logger, logging.Logger)
+        assert isinstance(loggers["default"], logging.Logger)
 
-    def test_get_logger_with_name(self):
+    def test_get_logger_with_name(self, loggers):
         """get_logger应该使用指定的名称"""
-        logger = get_logger("my_test_logger")
-        assert logger.name == "my_test_logger"
+        assert loggers["default"].name == PREFIX + "default"
 
-    def test_get_logger_default_level(self):
+    def test_get_logger_default_level(self, loggers):
         """默认日志级别应该是INFO"""
-        logger = get_logger("test_default_level")
-        assert logger.level == logging.INFO
+        assert loggers["default"].level == logging.INFO
 
-    def test_get_logger_custom_level(self):
+    def test_get_logger_custom_level(self, loggers):
         """应该能设置自定义日志级别"""
-        logger = get_logger("test_debug", level="DEBUG")
-        assert logger.level == logging.DEBUG
+        assert loggers["debug"].level == logging.DEBUG
 
-    def test_get_logger_warning_level(self):
+    def test_get_logger_warning_level(self, loggers):
         """应该能设置WARNING级别"""
-        logger = get_logger("test_warning", level="WARNING")
-        assert logger.level == logging.WARNING
+        assert loggers["warning"].level == logging.WARNING
 
-    def test_get_logger_error_level(self):
+    def test_get_logger_error_level(self, loggers):
         """应该能设置ERROR级别"""
-        logger = get_logger("test_error", level="ERROR")
-        assert logger.level == logging.ERROR
+        assert loggers["error"].level == logging.ERROR
 
-    def test_logger_has_handler(self):
+    def test_logger_has_handler(self, loggers):
         """Logger应该有handler"""
-        logger = get_logger("test_handler")
-        assert len(logger.handlers) > 0
+        assert len(loggers["default"].handlers) > 0
 
-    def test_logger_handler_is_stream_handler(self):
+    def test_logger_handler_is_stream_handler(self, loggers):
         """Handler应该是StreamHandler"""
-        logger = get_logger("test_stream")
-        assert any(isinstance(h, logging.StreamHandler) for h in logger.handlers)
+        assert any(
+            isinstance(h, logging.StreamHandler) for h in loggers["default"].handlers
+        )
 
-    def test_logger_handler_has_formatter(self):
+    def test_logger_handler_has_formatter(self, loggers):
         """Handler应该有formatter"""
-        logger = get_logger("test_formatter")
-        for handler in logger.handlers:
+        for handler in loggers["default"].handlers:
             assert handler.formatter is not None
 
-    def test_logger_can_log_info(self):
+    def test_logger_can_log_info(self, loggers):
         """应该能记录INFO日志（不抛异常）"""
-        logger = get_logger("test_info")
         try:
-            logger.info("Test info message")
+            loggers["default"].info("Test info message")
         except Exception as e:
             pytest.fail(f"Logger.info() raised an exception: {e}")
 
-    def test_logger_can_log_debug(self):
+    def test_logger_can_log_debug(self, loggers):
         """应该能记录DEBUG日志"""
-        logger = get_logger("test_debug_msg", level="DEBUG")
         try:
-            logger.debug("Test debug message")
+            loggers["debug"].debug("Test debug message")
         except Exception as e:
             pytest.fail(f"Logger.debug() raised an exception: {e}")
 
-    def test_logger_can_log_warning(self):
+    def test_logger_can_log_warning(self, loggers):
         """应该能记录WARNING日志"""
-        logger = get_logger("test_warning_msg")
         try:
-            logger.warning("Test warning message")
+            loggers["default"].warning("Test warning message")
         except Exception as e:
             pytest.fail(f"Logger.warning() raised an exception: {e}")
 
-    def test_logger_can_log_error(self):
+    def test_logger_can_log_error(self, loggers):
         """应该能记录ERROR日志"""
-        logger = get_logger("test_error_msg")
         try:
-            logger.error("Test error message")
+            loggers["default"].error("Test error message")
         except Exception as e:
             pytest.fail(f"Logger.error() raised an exception: {e}")
 
-    def test_get_same_logger_twice(self):
+    def test_get_same_logger_twice(self, loggers):
         """多次获取同一logger应该返回同一实例"""
-        logger1 = get_logger("test_same")
-        logger2 = get_logger("test_same")
-        assert logger1 is logger2
+        assert get_logger(PREFIX + "default") is loggers["default"]
+
+    def test_get_logger_does_not_duplicate_handlers(self, loggers):
+        """重复获取不应该重复添加handler"""
+        logger = get_logger(PREFIX + "default")
+        # 只统计 get_logger 添加的 handler（pytest 可能附加自己的捕获 handler）
+        assert sum(type(h) is logging.StreamHandler for h in logger.handlers) == 1
 
-    def test_case_insensitive_level(self):
+    def test_case_insensitive_level(self, loggers):
         """日志级别应该不区分大小写"""
-        logger = get_logger("test_case", level="debug")
-        assert logger.level == logging.DEBUG
+        assert loggers["lowercase"].level == logging.DEBUG
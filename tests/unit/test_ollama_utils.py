@@ -3,88 +3,176 @@ ollama_utils 单元测试
 """
 
 import json
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import patch
 
+import httpx
 import pytest
 
 from aicode.llm import ollama_utils
 
 
+class FakeOllama:
+    """
+    进程内的假 Ollama 服务（作为 httpx.MockTransport 的处理函数）
+
+    按 (method, path) 注册响应，记录收到的全部请求
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+
+    def route(self, method, path, status=200, json=None, content=None, error=None):
+        """注册响应；error 不为空时模拟网络异常"""
+        self.routes[(method, path)] = (status, json, content, error)
+
+    def __call__(self, request):
+        self.requests.append(request)
+        route = self.routes.get((request.method, request.url.path))
+        if route is None:
+            return httpx.Response(404)
+        status, data, content, error = route
+        if error is not None:
+            raise error
+        if data is not None:
+            return httpx.Response(status, json=data)
+        return httpx.Response(status, content=content or b"")
+
+
+@pytest.fixture
+def ollama(monkeypatch):
+    """把模块共享的 HTTP 客户端替换为挂在 FakeOllama 上的客户端"""
+    server = FakeOllama()
+    client = httpx.Client(
+        transport=httpx.MockTransport(server), timeout=ollama_utils.OLLAMA_TIMEOUT
+    )
+    monkeypatch.setattr(ollama_utils, "_client", client)
+    yield server
+    client.close()
+
+
+@pytest.fixture(autouse=True)
+def clear_availability_cache():
+    """每个测试前清空可用性缓存，避免测试之间互相影响"""
+    ollama_utils.clear_availability_cache()
+    yield
+    ollama_utils.clear_availability_cache()
+
+
+class TestSharedClient:
+    """测试共享 HTTP 客户端"""
+
+    def test_get_client_reused(self):
+        """多次获取应该返回同一个客户端"""
+        try:
+            assert ollama_utils.get_client() is ollama_utils.get_client()
+        finally:
+            ollama_utils.close_client()
+
+    def test_get_client_default_timeout(self):
+        """默认超时应该是 10 秒，连接超时 2 秒"""
+        try:
+            timeout = ollama_utils.get_client().timeout
+            assert (timeout.read, timeout.connect) == (10.0, 2.0)
+        finally:
+            ollama_utils.close_client()
+
+    def test_close_client_recreates(self):
+        """关闭后应该重新创建客户端"""
+        client = ollama_utils.get_client()
+        ollama_utils.close_client()
+        try:
+            assert ollama_utils.get_client() is not client
+        finally:
+            ollama_utils.close_client()
+
+
 class TestIsOllamaAvailable:
     """测试 Ollama 服务可用性检查"""
 
-    @patch("aicode.llm.ollama_utils.httpx.get")
-    def test_ollama_available(self, mock_get):
+    def test_ollama_available(self, ollama):
         """测试 Ollama 可用"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
+        ollama.route("GET", "/api/tags", json={"models": []})
 
         assert ollama_utils.is_ollama_available() is True
-        mock_get.assert_called_once_with("http://localhost:11434/api/tags", timeout=2.0)
+        (request,) = ollama.requests
+        assert str(request.url) == "http://localhost:11434/api/tags"
+        assert request.extensions["timeout"]["read"] == 2.0
 
-    @patch("aicode.llm.ollama_utils.httpx.get")
-    def test_ollama_unavailable(self, mock_get):
+    def test_ollama_unavailable(self, ollama):
         """测试 Ollama 不可用"""
-        mock_get.side_effect = Exception("Connection refused")
+        ollama.route("GET", "/api/tags", error=httpx.ConnectError("refused"))
+
+        assert ollama_utils.is_ollama_available() is False
+
+    def test_ollama_error_status(self, ollama):
+        """非 200 响应视为不可用"""
+        ollama.route("GET", "/api/tags", status=500)
 
         assert ollama_utils.is_ollama_available() is False
 
-    @patch("aicode.llm.ollama_utils.httpx.get")
-    def test_custom_base_url(self, mock_get):
+    def test_custom_base_url(self, ollama):
         """测试自定义基础 URL"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
+        ollama.route("GET", "/api/tags", json={"models": []})
 
         ollama_utils.is_ollama_available(base_url="http://custom:8080")
-        mock_get.assert_called_once_with("http://custom:8080/api/tags", timeout=2.0)
+        assert str(ollama.requests[0].url) == "http://custom:8080/api/tags"
+
+    def test_result_cached_within_ttl(self, ollama):
+        """TTL 内重复检查应该复用缓存结果"""
+        ollama.route("GET", "/api/tags", json={"models": []})
+
+        assert ollama_utils.is_ollama_available() is True
+        assert ollama_utils.is_ollama_available() is True
+        assert len(ollama.requests) == 1
+
+    def test_cache_expires_after_ttl(self, ollama):
+        """超过 TTL 后应该重新探测"""
+        ollama.route("GET", "/api/tags", json={"models": []})
+
+        with patch("aicode.llm.ollama_utils.time.monotonic", side_effect=[0.0, 10.0]):
+            ollama_utils.is_ollama_available()
+            ollama_utils.is_ollama_available()
+        assert len(ollama.requests) == 2
 
 
 class TestListLocalModels:
     """测试列出本地模型"""
 
-    @patch("aicode.llm.ollama_utils.httpx.get")
-    def test_list_models_success(self, mock_get):
+    def test_list_models_success(self, ollama):
         """测试成功列出模型"""
-        mock_response = Mock()
-        mock_response.json.return_value = {
-            "models": [
-                {"name": "llama2:13b", "size": 7300000000, "modified_at": "2024-01-01"},
-                {
-                    "name": "codellama:7b",
-                    "size": 3800000000,
-                    "modified_at": "2024-01-02",
-                },
-            ]
-        }
-        mock_get.return_value = mock_response
+        ollama.route(
+            "GET",
+            "/api/tags",
+            json={
+                "models": [
+                    {
+                        "name": "llama2:13b",
+                        "size": 7300000000,
+                        "modified_at": "2024-01-01",
+                    },
+                    {
+                        "name": "codellama:7b",
+                        "size": 3800000000,
+                        "modified_at": "2024-01-02",
+                    },
+                ]
+            },
+        )
 
         models = ollama_utils.list_local_models()
 
-        assert len(models) == 2
-        assert models[0]["name"] == "llama2:13b"
-        assert models[1]["name"] == "codellama:7b"
+        assert [m["name"] for m in models] == ["llama2:13b", "codellama:7b"]
 
-    @patch("aicode.llm.ollama_utils.httpx.get")
-    def test_list_models_empty(self, mock_get):
+    def test_list_models_empty(self, ollama):
         """测试空模型列表"""
-        mock_response = Mock()
-        mock_response.json.return_value = {"models": []}
-        mock_get.return_value = mock_response
+        ollama.route("GET", "/api/tags", json={"models": []})
 
-        models = ollama_utils.list_local_models()
+        assert ollama_utils.list_local_models() == []
 
-        assert models == []
-
-    @patch("aicode.llm.ollama_utils.httpx.get")
-    def test_list_models_error(self, mock_get):
+    def test_list_models_error(self, ollama):
         """测试 API 错误"""
-        import httpx
-
-        mock_get.side_effect = httpx.HTTPStatusError(
-            "Error", request=Mock(), response=Mock()
-        )
+        ollama.route("GET", "/api/tags", status=500)
 
         with pytest.raises(httpx.HTTPStatusError):
             ollama_utils.list_local_models()
@@ -93,40 +181,40 @@ class TestListLocalModels:
 class TestPullModel:
     """测试下载模型"""
 
-    @patch("aicode.llm.ollama_utils.httpx.stream")
     @patch("builtins.print")
-    def test_pull_model_success(self, mock_print, mock_stream):
+    def test_pull_model_success(self, mock_print, ollama):
         """测试成功下载模型"""
-        # 模拟流式响应
-        mock_response = MagicMock()
-        mock_response.__enter__.return_value = mock_response
-        mock_response.raise_for_status = Mock()
-        mock_response.iter_lines.return_value = [
-            json.dumps({"status": "downloading", "completed": 50, "total": 100}),
-            json.dumps({"status": "downloading", "completed": 100, "total": 100}),
-            json.dumps({"status": "success"}),
+        lines = [
+            {"status": "downloading", "completed": 50, "total": 100},
+            {"status": "downloading", "completed": 100, "total": 100},
+            {"status": "success"},
         ]
-
-        mock_stream.return_value = mock_response
+        ollama.route(
+            "POST",
+            "/api/pull",
+            content="\n".join(json.dumps(line) for line in lines).encode("utf-8"),
+        )
 
         ollama_utils.pull_model("llama2:13b")
 
-        mock_stream.assert_called_once()
+        (request,) = ollama.requests
+        assert json.loads(request.content) == {"name": "llama2:13b"}
         # 验证打印了进度
-        assert mock_print.call_count > 0
+        mock_print.assert_any_call("\rdownloading: 50%", end="", flush=True)
+        mock_print.assert_any_call("\rsuccess", end="", flush=True)
+
+    def test_iter_ndjson_lines(self):
+        """字节块应该按换行切分，跨块的行拼接完整，空行跳过"""
+        chunks = [b'{"a": 1}\n{"b"', b": 2}\r\n\n", b'{"c": 3}']
+        assert list(ollama_utils._iter_ndjson_lines(chunks)) == [
+            b'{"a": 1}',
+            b'{"b": 2}',
+            b'{"c": 3}',
+        ]
 
-    @patch("aicode.llm.ollama_utils.httpx.stream")
-    def test_pull_model_error(self, mock_stream):
+    def test_pull_model_error(self, ollama):
         """测试下载失败"""
-        import httpx
-
-        mock_response = MagicMock()
-        mock_response.__enter__.return_value = mock_response
-        mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-            "Not found", request=Mock(), response=Mock()
-        )
-
-        mock_stream.return_value = mock_response
+        ollama.route("POST", "/api/pull", status=404)
 
         with pytest.raises(httpx.HTTPStatusError):
             ollama_utils.pull_model("invalid-model")
@@ -135,29 +223,19 @@ class TestPullModel:
 class TestDeleteModel:
     """测试删除模型"""
 
-    @patch("aicode.llm.ollama_utils.httpx.delete")
-    def test_delete_model_success(self, mock_delete):
+    def test_delete_model_success(self, ollama):
         """测试成功删除模型"""
-        mock_response = Mock()
-        mock_response.raise_for_status = Mock()
-        mock_delete.return_value = mock_response
+        ollama.route("DELETE", "/api/delete")
 
         ollama_utils.delete_model("llama2:13b")
 
-        mock_delete.assert_called_once_with(
-            "http://localhost:11434/api/delete",
-            json={"name": "llama2:13b"},
-            timeout=10.0,
-        )
+        (request,) = ollama.requests
+        assert str(request.url) == "http://localhost:11434/api/delete"
+        assert json.loads(request.content) == {"name": "llama2:13b"}
 
-    @patch("aicode.llm.ollama_utils.httpx.delete")
-    def test_delete_model_error(self, mock_delete):
+    def test_delete_model_error(self, ollama):
         """测试删除失败"""
-        import httpx
-
-        mock_delete.side_effect = httpx.HTTPStatusError(
-            "Not found", request=Mock(), response=Mock()
-        )
+        ollama.route("DELETE", "/api/delete", status=404)
 
         with pytest.raises(httpx.HTTPStatusError):
             ollama_utils.delete_model("nonexistent")
@@ -166,64 +244,73 @@ class TestDeleteModel:
 class TestShowModelInfo:
     """测试显示模型信息"""
 
-    @patch("aicode.llm.ollama_utils.httpx.post")
-    def test_show_model_info_success(self, mock_post):
+    def test_show_model_info_success(self, ollama):
         """测试成功获取模型信息"""
-        mock_response = Mock()
-        mock_response.json.return_value = {
-            "modelfile": "FROM llama2",
-            "parameters": "temperature 0.7",
-            "template": "{{.System}}\n{{.Prompt}}",
-        }
-        mock_post.return_value = mock_response
+        ollama.route(
+            "POST",
+            "/api/show",
+            json={
+                "modelfile": "FROM llama2",
+                "parameters": "temperature 0.7",
+                "template": "{{.System}}\n{{.Prompt}}",
+            },
+        )
 
         info = ollama_utils.show_model_info("llama2:13b")
 
         assert "modelfile" in info
         assert "parameters" in info
-        mock_post.assert_called_once()
+        assert json.loads(ollama.requests[0].content) == {"name": "llama2:13b"}
 
 
 class TestListRemoteModels:
     """测试列出远端模型"""
 
-    @patch("aicode.llm.ollama_utils.httpx.get")
-    def test_list_remote_models_success(self, mock_get):
+    def test_list_remote_models_success(self, ollama):
         """测试成功获取远端模型列表"""
-        mock_response = Mock()
-        mock_response.json.return_value = [
-            {"name": "llama3:latest", "size": "42GB", "description": "Llama 3"},
-            {"name": "gemma2:9b", "size": "5.4GB", "description": "Gemma 2"},
-        ]
-        mock_get.return_value = mock_response
+        ollama.route(
+            "GET",
+            "/api/v1/models",
+            json=[
+                {"name": "llama3:latest", "size": "42GB", "description": "Llama 3"},
+                {"name": "gemma2:9b", "size": "5.4GB", "description": "Gemma 2"},
+            ],
+        )
 
         models = ollama_utils.list_remote_models()
 
         assert len(models) == 2
         assert models[0]["name"] == "llama3:latest"
 
-    @patch("aicode.llm.ollama_utils.httpx.get")
-    def test_list_remote_models_with_search(self, mock_get):
+    def test_list_remote_models_uses_remote_timeout(self, ollama):
+        """远端请求应该使用较长的超时，而不是本地服务的 2 秒连接超时"""
+        ollama.route("GET", "/api/v1/models", json=[])
+
+        ollama_utils.list_remote_models()
+
+        timeout = ollama.requests[0].extensions["timeout"]
+        assert (timeout["connect"], timeout["read"]) == (10.0, 15.0)
+
+    def test_list_remote_models_with_search(self, ollama):
         """测试搜索远端模型"""
-        mock_response = Mock()
-        mock_response.json.return_value = [
-            {"name": "codellama:7b", "size": "3.8GB", "description": "Code Llama"}
-        ]
-        mock_get.return_value = mock_response
+        ollama.route(
+            "GET",
+            "/api/v1/models",
+            json=[
+                {"name": "codellama:7b", "size": "3.8GB", "description": "Code Llama"}
+            ],
+        )
 
         models = ollama_utils.list_remote_models(search="code")
 
-        mock_get.assert_called_once_with(
-            "https://ollamadb.dev/api/v1/models",
-            params={"search": "code"},
-            timeout=10.0,
+        assert str(ollama.requests[0].url) == (
+            "https://ollamadb.dev/api/v1/models?search=code"
         )
         assert len(models) == 1
 
-    @patch("aicode.llm.ollama_utils.httpx.get")
-    def test_list_remote_models_fallback(self, mock_get):
+    def test_list_remote_models_fallback(self, ollama):
         """测试 API 失败时使用内置列表"""
-        mock_get.side_effect = Exception("Network error")
+        ollama.route("GET", "/api/v1/models", error=httpx.ConnectError("offline"))
 
         models = ollama_utils.list_remote_models()
 
@@ -261,6 +348,11 @@ class TestGetBuiltinModels:
 
         assert len(models_lower) == len(models_upper)
 
+    def test_builtin_models_returns_copies(self):
+        """返回的模型字典应该是副本，修改后不影响内置列表"""
+        ollama_utils._get_builtin_models()[0]["name"] = "changed"
+        assert ollama_utils._get_builtin_models()[0]["name"] != "changed"
+
 
 class TestSearchModels:
     """测试搜索模型（便捷函数）"""
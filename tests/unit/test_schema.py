@@ -2,6 +2,8 @@
 测试数据模型
 """
 
+from dataclasses import replace
+
 import pytest
 
 from aicode.models.schema import (
@@ -11,6 +13,28 @@ from aicode.models.schema import (
     row_to_model,
 )
 
+pytestmark = pytest.mark.unit
+
+# 模块级共享的模型实例（测试只读不改），变体通过 dataclasses.replace 派生
+_BASE_MODEL = ModelSchema(name="test", provider="test")
+
+_FULL_MODEL = ModelSchema(
+    name="gpt-4",
+    provider="openai",
+    api_key="sk-test",
+    api_url="https://api.openai.com/v1",
+    max_input_tokens=8192,
+    max_output_tokens=4096,
+    context_window=128000,
+    code_score=9.0,
+    reasoning_score=9.5,
+    speed_score=7.0,
+    cost_per_1k_input=0.03,
+    cost_per_1k_output=0.06,
+    specialties=["code", "reasoning"],
+    notes="Best for complex tasks",
+)
+
 
 class TestModelSchema:
     """测试 ModelSchema 数据类"""
@@ -24,26 +48,11 @@ class TestModelSchema:
 
     def test_create_full_model(self):
         """创建完整模型"""
-        model = ModelSchema(
-            name="gpt-4",
-            provider="openai",
-            api_key="sk-test",
-            api_url="https://api.openai.com/v1",
-            max_input_tokens=8192,
-            max_output_tokens=4096,
-            context_window=128000,
-            code_score=9.0,
-            reasoning_score=9.5,
-            speed_score=7.0,
-            cost_per_1k_input=0.03,
-            cost_per_1k_output=0.06,
-            specialties=["code", "reasoning"],
-            notes="Best for complex tasks",
-        )
+        model = _FULL_MODEL
         assert model.name == "gpt-4"
         assert model.max_input_tokens == 8192
         assert model.code_score == 9.0
-        assert model.specialties == ["code", "reasoning"]
+        assert model.specialties == ("code", "reasoning")
 
     def test_to_dict(self):
         """测试转换为字典"""
@@ -57,8 +66,7 @@ class TestModelSchema:
 
     def test_to_dict_no_specialties(self):
         """测试无专长时转换为字典"""
-        model = ModelSchema(name="test", provider="test")
-        data = model.to_dict()
+        data = _BASE_MODEL.to_dict()
         assert data["specialties"] is None
 
     def test_from_dict(self):
@@ -72,55 +80,66 @@ class TestModelSchema:
         model = ModelSchema.from_dict(data)
         assert model.name == "gpt-4"
         assert model.max_input_tokens == 8192
-        assert model.specialties == ["code", "reasoning"]
+        assert model.specialties == ("code", "reasoning")
 
     def test_from_dict_with_list_specialties(self):
-        """测试从字典创建（专长已是列表）"""
+        """测试从字典创建（专长为列表时转为元组）"""
         data = {"name": "test", "provider": "test", "specialties": ["code", "chat"]}
         model = ModelSchema.from_dict(data)
-        assert model.specialties == ["code", "chat"]
+        assert model.specialties == ("code", "chat")
+
+    def test_specialties_stored_as_tuple(self):
+        """专长无论以列表还是字符串传入，都应该存为元组"""
+        assert replace(_BASE_MODEL, specialties=["code"]).specialties == ("code",)
+        model = replace(_BASE_MODEL, specialties="code, chat")
+        assert model.specialties == ("code", "chat")
+        assert model.to_dict()["specialties"] == "code,chat"
+
+    def test_from_dict_rejects_unknown_keys(self):
+        """测试从字典创建时遇到非字段键应该报错"""
+        data = {"name": "test", "provider": "test", "created_at": "2024-01-01"}
+        with pytest.raises(TypeError, match="created_at"):
+            ModelSchema.from_dict(data)
+
+    def test_row_to_model_drops_timestamps(self):
+        """测试数据库行中的时间戳列被移除"""
+        row = {
+            "name": "test",
+            "provider": "test",
+            "created_at": "2024-01-01",
+            "updated_at": "2024-01-02",
+        }
+        assert row_to_model(row) == _BASE_MODEL
 
     def test_get_context_limit_with_context_window(self):
         """测试获取上下文限制（优先使用context_window）"""
-        model = ModelSchema(
-            name="test", provider="test", context_window=100000, max_input_tokens=8192
-        )
+        model = replace(_BASE_MODEL, context_window=100000, max_input_tokens=8192)
         limit = model.get_context_limit()
         assert limit == int(100000 * 0.9)  # 使用缓冲比例
 
     def test_get_context_limit_with_max_input(self):
         """测试获取上下文限制（使用max_input_tokens）"""
-        model = ModelSchema(name="test", provider="test", max_input_tokens=8192)
+        model = replace(_BASE_MODEL, max_input_tokens=8192)
         limit = model.get_context_limit()
         assert limit == int(8192 * 0.9)
 
     def test_get_context_limit_none(self):
         """测试获取上下文限制（无数据）"""
-        model = ModelSchema(name="test", provider="test")
-        limit = model.get_context_limit()
+        limit = _BASE_MODEL.get_context_limit()
         assert limit is None
 
     def test_validate_scores_valid(self):
         """测试验证有效评分"""
-        model = ModelSchema(
-            name="test",
-            provider="test",
-            code_score=9.0,
-            reasoning_score=8.5,
-            speed_score=7.0,
-        )
-        assert model.validate_scores() is True
+        assert _FULL_MODEL.validate_scores() is True
 
     def test_validate_scores_invalid(self):
         """测试验证无效评分"""
-        model = ModelSchema(name="test", provider="test", code_score=11.0)  # 超出范围
+        model = replace(_BASE_MODEL, code_score=11.0)  # 超出范围
         assert model.validate_scores() is False
 
     def test_validate_scores_with_none(self):
         """测试验证评分（包含None）"""
-        model = ModelSchema(
-            name="test", provider="test", code_score=9.0, reasoning_score=None
-        )
+        model = replace(_BASE_MODEL, code_score=9.0, reasoning_score=None)
         assert model.validate_scores() is True
 
 
@@ -159,7 +178,7 @@ class TestRowToModel:
         model = row_to_model(row)
         assert isinstance(model, ModelSchema)
         assert model.name == "gpt-4"
-        assert model.specialties == ["code", "reasoning"]
+        assert model.specialties == ("code", "reasoning")
 
     def test_row_to_model_invalid_type(self):
         """测试不支持的行类型"""
@@ -189,7 +208,7 @@ class TestImportModelFromPreconfig:
         model = import_model_from_preconfig(config)
         assert model.name == "claude-3"
         assert model.max_input_tokens == 200000
-        assert model.specialties == ["code", "reasoning"]
+        assert model.specialties == ("code", "reasoning")
 
     def test_import_missing_name(self):
         """导入缺少name应该报错"""
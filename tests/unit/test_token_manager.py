@@ -2,25 +2,71 @@
 测试Token管理器
 """
 
+import copy
+from types import SimpleNamespace
+
 import pytest
 
 from aicode.llm.exceptions import TokenError, TokenLimitExceededError
 from aicode.llm.token_manager import TokenManager
 from aicode.models.schema import ModelSchema
 
+# 纯单元测试；并行运行（pytest-xdist --dist loadgroup）时整组落在同一个 worker，
+# tiktoken 编码器每个进程只加载一次
+pytestmark = [pytest.mark.unit, pytest.mark.xdist_group("tiktoken")]
 
-@pytest.fixture
-def token_manager():
+# 测试用的长文本在模块加载时构造一次，各测试共享
+_LONG_TEXT = "test " * 1000
+_REPEATED_HELLO = "Hello, world! " * 100
+_REPEATED_CHINESE = "你好，世界！" * 50
+_VERY_LONG_TEXT = "This is a very long text " * 100
+_ANY_TEXT = "Any text" * 1000
+_WORDS_50 = "word " * 50
+_WORDS_100 = "word " * 100
+
+
+# TokenManager 只读不改，整个模块共享同一实例，避免每个测试重复加载编码器
+@pytest.fixture(scope="module")
+def token_manager(tiktoken_warmup):
     """Token管理器fixture"""
     return TokenManager()
 
 
-@pytest.fixture
-def gpt4_token_manager():
+@pytest.fixture(scope="module")
+def gpt4_token_manager(tiktoken_warmup):
     """GPT-4 Token管理器fixture"""
     return TokenManager(model_name="gpt-4")
 
 
+@pytest.fixture
+def lazy_tm():
+    """
+    未加载编码器的Token管理器（编码器在首次编码时才加载）
+
+    用于测试不需要编码的提前返回分支；测试结束时检查编码器确实没有被加载
+    """
+    tm = TokenManager()
+    yield tm
+    assert "encoding" not in vars(tm), "early-exit path should not load encoding"
+
+
+@pytest.fixture
+def fake_tm():
+    """
+    不加载 tiktoken 的 Token管理器：每个空白分隔的单词算一个token
+
+    只用于测试计数之上的分支逻辑（限制检查、成本、剩余token），不关心真实分词结果
+    """
+    tm = TokenManager.__new__(TokenManager)
+    tm.model_name = None
+    tm.encoding_name = "fake"
+    tm.encoding = SimpleNamespace(
+        encode=lambda text: list(range(len(text.split()))),
+        decode=lambda ids: " ".join("x" for _ in ids),
+    )
+    return tm
+
+
 @pytest.fixture
 def sample_model():
     """示例模型fixture"""
@@ -32,6 +78,7 @@ def sample_model():
 class TestTokenManager:
     """测试TokenManager基本功能"""
 
+    @pytest.mark.network
     def test_init_default(self):
         """应该能用默认参数初始化"""
         tm = TokenManager()
@@ -54,31 +101,56 @@ class TestTokenManager:
         tm = TokenManager(model_name="gpt-4", encoding_name="p50k_base")
         assert tm.encoding_name == "p50k_base"
 
+    def test_init_does_not_load_encoding(self):
+        """初始化不应该加载编码器"""
+        tm = TokenManager(model_name="gpt-4")
+        assert "encoding" not in vars(tm)
+
+    def test_unknown_encoding_raises_on_first_use(self):
+        """未知编码器应该在首次使用时抛出TokenError"""
+        tm = TokenManager(encoding_name="no-such-encoding")
+        with pytest.raises(TokenError, match="Failed to load encoding"):
+            tm.encoding
+
+
+class TestGetEncodingName:
+    """测试模型名到编码器的解析（静态方法，无需加载编码器）"""
+
     def test_get_encoding_name_known_model(self):
         """已知模型应该返回正确的编码器"""
-        tm = TokenManager()
-        encoding = tm._get_encoding_name("gpt-4")
+        encoding = TokenManager._get_encoding_name("gpt-4")
         assert encoding == "cl100k_base"
 
     def test_get_encoding_name_unknown_model(self):
         """未知模型应该返回默认编码器"""
-        tm = TokenManager()
-        encoding = tm._get_encoding_name("unknown-model")
+        encoding = TokenManager._get_encoding_name("unknown-model")
         assert encoding == TokenManager.DEFAULT_ENCODING
 
     def test_get_encoding_name_prefix_match(self):
         """应该支持前缀匹配"""
-        tm = TokenManager()
-        encoding = tm._get_encoding_name("gpt-4-turbo-preview")
+        encoding = TokenManager._get_encoding_name("gpt-4-turbo-preview")
         assert encoding == "cl100k_base"
 
+    def test_model_prefixes_longest_first(self):
+        """前缀匹配表应该按前缀长度降序，优先匹配最具体的前缀"""
+        lengths = [len(prefix) for prefix, _ in TokenManager._MODEL_PREFIXES]
+        assert lengths == sorted(lengths, reverse=True)
+        assert dict(TokenManager._MODEL_PREFIXES) == TokenManager.MODEL_ENCODINGS
+
+    def test_get_encoding_name_cached(self):
+        """相同模型名的重复查询应该命中缓存"""
+        TokenManager._get_encoding_name("gpt-3.5-turbo-16k")
+        hits = TokenManager._get_encoding_name.cache_info().hits
+        TokenManager._get_encoding_name("gpt-3.5-turbo-16k")
+        assert TokenManager._get_encoding_name.cache_info().hits == hits + 1
+
 
 class TestCountTokens:
     """测试token计数"""
 
-    def test_count_empty_text(self, token_manager):
+    def test_count_empty_text(self, lazy_tm):
         """空文本应该返回0"""
-        count = token_manager.count_tokens("")
+        count = lazy_tm.count_tokens("")
         assert count == 0
 
     def test_count_simple_text(self, token_manager):
@@ -105,42 +177,99 @@ def hello():
 
     def test_count_long_text(self, token_manager):
         """应该能计数长文本"""
-        text = "test " * 1000
+        text = _LONG_TEXT
         count = token_manager.count_tokens(text)
         assert count > 1000
 
 
+class TestCountTokensCache:
+    """测试token计数缓存"""
+
+    def test_repeated_text_encoded_once(self, fake_tm):
+        """相同文本重复计数只应该编码一次"""
+        calls = []
+        encode = fake_tm.encoding.encode
+        fake_tm.encoding.encode = lambda text: calls.append(text) or encode(text)
+
+        assert fake_tm.count_tokens(_WORDS_50) == 50
+        assert fake_tm.count_tokens(_WORDS_50) == 50
+        assert calls == [_WORDS_50]
+
+    def test_long_text_not_cached(self, fake_tm):
+        """超过长度上限的文本不应该进入缓存"""
+        long_text = "word " * (fake_tm.COUNT_CACHE_MAX_CHARS // 5 + 1)
+        assert fake_tm.count_tokens(long_text) == len(long_text.split())
+        assert fake_tm._count_cached.cache_info().currsize == 0
+
+        fake_tm.count_tokens(_WORDS_50)
+        assert fake_tm._count_cached.cache_info().currsize == 1
+
+    def test_cache_is_per_instance(self, fake_tm):
+        """缓存属于实例，不同实例互不影响"""
+        other = copy.copy(fake_tm)
+        fake_tm.count_tokens(_WORDS_50)
+        assert other._count_cached.cache_info().currsize == 0
+
+
 class TestCheckLimit:
     """测试token限制检查"""
 
-    def test_check_limit_within(self, token_manager, sample_model):
+    def test_check_limit_within(self, fake_tm, sample_model):
         """未超过限制应该返回True"""
         text = "Hello, world!"
-        result = token_manager.check_limit(text, sample_model)
+        result = fake_tm.check_limit(text, sample_model)
         assert result is True
 
-    def test_check_limit_exceeded(self, token_manager):
+    def test_check_limit_exceeded(self, fake_tm):
         """超过限制应该抛出异常"""
         # 创建一个小限制的模型
         model = ModelSchema(name="test", provider="test", max_input_tokens=10)
-        text = "This is a very long text " * 100
+        text = _VERY_LONG_TEXT
         with pytest.raises(TokenLimitExceededError):
-            token_manager.check_limit(text, model)
+            fake_tm.check_limit(text, model)
 
-    def test_check_limit_no_limit(self, token_manager):
+    def test_check_limit_no_limit(self, lazy_tm):
         """没有限制的模型应该返回True"""
         model = ModelSchema(name="test", provider="test")
-        text = "Any text" * 1000
-        result = token_manager.check_limit(text, model)
+        text = _ANY_TEXT
+        result = lazy_tm.check_limit(text, model)
         assert result is True
 
 
+class TestAnalyze:
+    """测试一次编码的token统计"""
+
+    def test_analyze_within_limit(self, fake_tm, sample_model):
+        """未超过限制应该同时给出计数和剩余token"""
+        analysis = fake_tm.analyze(_WORDS_50, sample_model)
+        limit = sample_model.get_context_limit()
+        assert analysis == (50, True, limit - 50)
+        assert analysis.remaining == fake_tm.get_remaining_tokens(
+            _WORDS_50, sample_model
+        )
+
+    def test_analyze_exceeded(self, fake_tm):
+        """超过限制不抛异常，within_limit为False且剩余为0"""
+        model = ModelSchema(name="test", provider="test", max_input_tokens=10)
+        analysis = fake_tm.analyze(_WORDS_100, model)
+        assert (analysis.count, analysis.within_limit, analysis.remaining) == (
+            100,
+            False,
+            0,
+        )
+
+    def test_analyze_no_limit(self, fake_tm):
+        """没有限制的模型剩余token应该为None"""
+        model = ModelSchema(name="test", provider="test")
+        assert fake_tm.analyze(_WORDS_50, model) == (50, True, None)
+
+
 class TestTruncateText:
     """测试文本截断"""
 
-    def test_truncate_empty_text(self, token_manager):
+    def test_truncate_empty_text(self, lazy_tm):
         """空文本应该返回空"""
-        result = token_manager.truncate_text("", 100)
+        result = lazy_tm.truncate_text("", 100)
         assert result == ""
 
     def test_truncate_within_limit(self, token_manager):
@@ -151,21 +280,46 @@ class TestTruncateText:
 
     def test_truncate_exceed_limit(self, token_manager):
         """超过限制应该截断"""
-        text = "Hello, world! " * 100
-        result = token_manager.truncate_text(text, 10)
-        assert len(result) < len(text)
+        result = token_manager.truncate_text(_REPEATED_HELLO, 10)
+        assert len(result) < len(_REPEATED_HELLO)
         token_count = token_manager.count_tokens(result)
         assert token_count <= 10
 
-    def test_truncate_zero_tokens(self, token_manager):
+    def test_truncate_with_count_matches_real_count(self, token_manager):
+        """返回的token数应该等于截断结果重新编码后的token数"""
+        for text in (_REPEATED_HELLO, _REPEATED_CHINESE):
+            result, count = token_manager._truncate_with_count(text, 7)
+            assert count == len(token_manager.encoding.encode(result))
+
+    def test_truncate_with_count_exceed_limit(self, fake_tm):
+        """截断时应该同时返回截断后的token数"""
+        result, count = fake_tm._truncate_with_count(_WORDS_100, 10)
+        assert count == 10
+        assert len(result) < len(_WORDS_100)
+
+    def test_truncate_text_uses_truncate_with_count(self, fake_tm):
+        """truncate_text 应该返回与 _truncate_with_count 相同的截断文本"""
+        expected, _ = fake_tm._truncate_with_count(_WORDS_100, 10)
+        assert fake_tm.truncate_text(_WORDS_100, 10) == expected
+
+    def test_truncate_with_count_within_limit(self, fake_tm):
+        """未超过限制应该原样返回文本及其token数"""
+        assert fake_tm._truncate_with_count(_WORDS_50, 100) == (_WORDS_50, 50)
+
+    def test_truncate_with_count_empty(self, fake_tm):
+        """空文本或max_tokens为0应该返回空文本和0"""
+        assert fake_tm._truncate_with_count("", 10) == ("", 0)
+        assert fake_tm._truncate_with_count(_WORDS_50, 0) == ("", 0)
+
+    def test_truncate_zero_tokens(self, lazy_tm):
         """max_tokens为0应该返回空"""
         text = "Hello, world!"
-        result = token_manager.truncate_text(text, 0)
+        result = lazy_tm.truncate_text(text, 0)
         assert result == ""
 
     def test_truncate_preserves_encoding(self, token_manager):
         """截断后的文本应该能正确解码"""
-        text = "你好，世界！" * 50
+        text = _REPEATED_CHINESE
         result = token_manager.truncate_text(text, 20)
         # 不应该包含乱码
         assert result  # 应该有内容
@@ -174,15 +328,15 @@ class TestTruncateText:
 class TestEstimateCost:
     """测试成本估算"""
 
-    def test_estimate_cost_input_only(self, token_manager):
+    def test_estimate_cost_input_only(self, fake_tm):
         """应该能估算仅输入的成本"""
         model = ModelSchema(name="gpt-4", provider="openai", cost_per_1k_input=0.03)
         text = "Hello, world!"
-        cost = token_manager.estimate_cost(text, model)
+        cost = fake_tm.estimate_cost(text, model)
         assert cost is not None
         assert cost > 0
 
-    def test_estimate_cost_with_output(self, token_manager):
+    def test_estimate_cost_with_output(self, fake_tm):
         """应该能估算包含输出的成本"""
         model = ModelSchema(
             name="gpt-4",
@@ -191,18 +345,18 @@ class TestEstimateCost:
             cost_per_1k_output=0.06,
         )
         text = "Hello, world!"
-        cost = token_manager.estimate_cost(text, model, output_tokens=100)
+        cost = fake_tm.estimate_cost(text, model, output_tokens=100)
         assert cost is not None
         assert cost > 0
 
-    def test_estimate_cost_no_pricing(self, token_manager):
+    def test_estimate_cost_no_pricing(self, lazy_tm):
         """没有价格信息应该返回None"""
         model = ModelSchema(name="test", provider="test")
         text = "Hello, world!"
-        cost = token_manager.estimate_cost(text, model)
+        cost = lazy_tm.estimate_cost(text, model)
         assert cost is None
 
-    def test_estimate_cost_calculation(self, token_manager):
+    def test_estimate_cost_calculation(self, fake_tm):
         """成本计算应该正确"""
         model = ModelSchema(
             name="test",
@@ -212,7 +366,7 @@ class TestEstimateCost:
         )
         # 假设输入是10个token，输出是20个token
         text = "test"  # 实际token数可能不同，只是测试逻辑
-        cost = token_manager.estimate_cost(text, model, output_tokens=1000)
+        cost = fake_tm.estimate_cost(text, model, output_tokens=1000)
         # 输出成本应该是 (1000/1000) * 0.02 = 0.02
         assert cost > 0.02  # 加上输入成本
 
@@ -220,31 +374,31 @@ class TestEstimateCost:
 class TestGetRemainingTokens:
     """测试剩余token计算"""
 
-    def test_get_remaining_tokens(self, token_manager, sample_model):
+    def test_get_remaining_tokens(self, fake_tm, sample_model):
         """应该能计算剩余token"""
         text = "Hello, world!"
-        remaining = token_manager.get_remaining_tokens(text, sample_model)
+        remaining = fake_tm.get_remaining_tokens(text, sample_model)
         assert remaining is not None
         assert remaining > 0
 
-    def test_get_remaining_tokens_no_limit(self, token_manager):
+    def test_get_remaining_tokens_no_limit(self, lazy_tm):
         """没有限制的模型应该返回None"""
         model = ModelSchema(name="test", provider="test")
         text = "Hello, world!"
-        remaining = token_manager.get_remaining_tokens(text, model)
+        remaining = lazy_tm.get_remaining_tokens(text, model)
         assert remaining is None
 
-    def test_get_remaining_tokens_nearly_full(self, token_manager):
+    def test_get_remaining_tokens_nearly_full(self, fake_tm):
         """接近限制应该返回较小的值"""
         model = ModelSchema(name="test", provider="test", max_input_tokens=100)
-        text = "word " * 50  # 接近限制
-        remaining = token_manager.get_remaining_tokens(text, model)
+        text = _WORDS_50  # 接近限制
+        remaining = fake_tm.get_remaining_tokens(text, model)
         assert remaining is not None
         assert remaining >= 0
 
-    def test_get_remaining_tokens_negative(self, token_manager):
+    def test_get_remaining_tokens_negative(self, fake_tm):
         """超过限制应该返回0（不是负数）"""
         model = ModelSchema(name="test", provider="test", max_input_tokens=10)
-        text = "word " * 100
-        remaining = token_manager.get_remaining_tokens(text, model)
+        text = _WORDS_100
+        remaining = fake_tm.get_remaining_tokens(text, model)
         assert remaining == 0
@@ -17,305 +17,267 @@ from aicode.utils.validators import (
     validate_url,
 )
 
+pytestmark = pytest.mark.unit
+
 
 class TestValidateModelName:
     """测试模型名称验证"""
 
-    def test_valid_name(self):
-        """有效的模型名称"""
-        assert validate_model_name("gpt-4") == "gpt-4"
-
-    def test_name_with_spaces(self):
-        """名称包含空格应该被trim"""
-        assert validate_model_name("  gpt-4  ") == "gpt-4"
-
-    def test_empty_name(self):
-        """空名称应该报错"""
-        with pytest.raises(ValidationError, match="required"):
-            validate_model_name("")
-
-    def test_none_name(self):
-        """None名称应该报错"""
-        with pytest.raises(ValidationError, match="required"):
-            validate_model_name(None)
-
-    def test_non_string_name(self):
-        """非字符串名称应该报错"""
-        with pytest.raises(ValidationError, match="must be a string"):
-            validate_model_name(123)
-
-    def test_too_long_name(self):
-        """过长名称应该报错"""
-        with pytest.raises(ValidationError, match="too long"):
-            validate_model_name("a" * 256)
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            pytest.param("gpt-4", "gpt-4", id="valid"),
+            pytest.param("  gpt-4  ", "gpt-4", id="trimmed"),
+        ],
+    )
+    def test_valid(self, value, expected):
+        """有效的模型名称（包含空格应该被trim）"""
+        assert validate_model_name(value) == expected
+
+    @pytest.mark.parametrize(
+        "value, message",
+        [
+            pytest.param("", "required", id="empty"),
+            pytest.param(None, "required", id="none"),
+            pytest.param(123, "must be a string", id="non-string"),
+            pytest.param("a" * 256, "too long", id="too-long"),
+        ],
+    )
+    def test_invalid(self, value, message):
+        """无效的模型名称应该报错"""
+        with pytest.raises(ValidationError, match=message):
+            validate_model_name(value)
 
 
 class TestValidateProvider:
     """测试提供商验证"""
 
-    def test_valid_provider(self):
-        """有效的提供商"""
-        assert validate_provider("openai") == "openai"
-
-    def test_provider_with_spaces(self):
-        """提供商名称包含空格应该被trim"""
-        assert validate_provider("  anthropic  ") == "anthropic"
-
-    def test_empty_provider(self):
-        """空提供商应该报错"""
-        with pytest.raises(ValidationError, match="required"):
-            validate_provider("")
-
-    def test_none_provider(self):
-        """None提供商应该报错"""
-        with pytest.raises(ValidationError, match="required"):
-            validate_provider(None)
-
-    def test_non_string_provider(self):
-        """非字符串提供商应该报错"""
-        with pytest.raises(ValidationError, match="must be a string"):
-            validate_provider(123)
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            pytest.param("openai", "openai", id="valid"),
+            pytest.param("  anthropic  ", "anthropic", id="trimmed"),
+        ],
+    )
+    def test_valid(self, value, expected):
+        """有效的提供商（包含空格应该被trim）"""
+        assert validate_provider(value) == expected
+
+    @pytest.mark.parametrize(
+        "value, message",
+        [
+            pytest.param("", "required", id="empty"),
+            pytest.param(None, "required", id="none"),
+            pytest.param(123, "must be a string", id="non-string"),
+        ],
+    )
+    def test_invalid(self, value, message):
+        """无效的提供商应该报错"""
+        with pytest.raises(ValidationError, match=message):
+            validate_provider(value)
 
 
 class TestValidateTokenCount:
     """测试Token数量验证"""
 
-    def test_valid_token_count(self):
-        """有效的token数量"""
-        assert validate_token_count(8192, "test") == 8192
-
-    def test_none_token_count(self):
-        """None应该返回None"""
-        assert validate_token_count(None, "test") is None
-
-    def test_zero_token_count(self):
-        """零应该报错"""
-        with pytest.raises(ValidationError, match="must be positive"):
-            validate_token_count(0, "test")
-
-    def test_negative_token_count(self):
-        """负数应该报错"""
-        with pytest.raises(ValidationError, match="must be positive"):
-            validate_token_count(-100, "test")
-
-    def test_non_integer_token_count(self):
-        """非整数应该报错"""
-        with pytest.raises(ValidationError, match="must be an integer"):
-            validate_token_count(8192.5, "test")
-
-    def test_too_large_token_count(self):
-        """过大的数值应该报错"""
-        with pytest.raises(ValidationError, match="too large"):
-            validate_token_count(20_000_000, "test")
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            pytest.param(8192, 8192, id="valid"),
+            pytest.param(None, None, id="none"),
+        ],
+    )
+    def test_valid(self, value, expected):
+        """有效的token数量，None应该返回None"""
+        assert validate_token_count(value, "test") == expected
+
+    @pytest.mark.parametrize(
+        "value, message",
+        [
+            pytest.param(0, "must be positive", id="zero"),
+            pytest.param(-100, "must be positive", id="negative"),
+            pytest.param(8192.5, "must be an integer", id="non-integer"),
+            pytest.param(20_000_000, "too large", id="too-large"),
+        ],
+    )
+    def test_invalid(self, value, message):
+        """无效的token数量应该报错"""
+        with pytest.raises(ValidationError, match=message):
+            validate_token_count(value, "test")
 
 
 class TestValidateScore:
     """测试评分验证"""
 
-    def test_valid_score_int(self):
-        """有效的整数评分"""
-        assert validate_score(9, "test") == 9.0
-
-    def test_valid_score_float(self):
-        """有效的浮点数评分"""
-        assert validate_score(8.5, "test") == 8.5
-
-    def test_none_score(self):
-        """None应该返回None"""
-        assert validate_score(None, "test") is None
-
-    def test_min_score(self):
-        """最小评分"""
-        assert validate_score(0.0, "test") == 0.0
-
-    def test_max_score(self):
-        """最大评分"""
-        assert validate_score(10.0, "test") == 10.0
-
-    def test_score_too_low(self):
-        """评分过低应该报错"""
-        with pytest.raises(ValidationError, match="must be between"):
-            validate_score(-1, "test")
-
-    def test_score_too_high(self):
-        """评分过高应该报错"""
-        with pytest.raises(ValidationError, match="must be between"):
-            validate_score(11, "test")
-
-    def test_non_numeric_score(self):
-        """非数字评分应该报错"""
-        with pytest.raises(ValidationError, match="must be a number"):
-            validate_score("high", "test")
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            pytest.param(9, 9.0, id="int"),
+            pytest.param(8.5, 8.5, id="float"),
+            pytest.param(None, None, id="none"),
+            pytest.param(0.0, 0.0, id="min"),
+            pytest.param(10.0, 10.0, id="max"),
+        ],
+    )
+    def test_valid(self, value, expected):
+        """有效的评分（含边界值），None应该返回None"""
+        assert validate_score(value, "test") == expected
+
+    @pytest.mark.parametrize(
+        "value, message",
+        [
+            pytest.param(-1, "must be between", id="too-low"),
+            pytest.param(11, "must be between", id="too-high"),
+            pytest.param("high", "must be a number", id="non-numeric"),
+        ],
+    )
+    def test_invalid(self, value, message):
+        """无效的评分应该报错"""
+        with pytest.raises(ValidationError, match=message):
+            validate_score(value, "test")
 
 
 class TestValidateCost:
     """测试成本验证"""
 
-    def test_valid_cost(self):
-        """有效的成本"""
-        assert validate_cost(0.03, "test") == 0.03
-
-    def test_none_cost(self):
-        """None应该返回None"""
-        assert validate_cost(None, "test") is None
-
-    def test_zero_cost(self):
-        """零成本应该有效"""
-        assert validate_cost(0, "test") == 0.0
-
-    def test_negative_cost(self):
-        """负成本应该报错"""
-        with pytest.raises(ValidationError, match="cannot be negative"):
-            validate_cost(-0.01, "test")
-
-    def test_too_large_cost(self):
-        """过大成本应该报错"""
-        with pytest.raises(ValidationError, match="too large"):
-            validate_cost(1001, "test")
-
-    def test_non_numeric_cost(self):
-        """非数字成本应该报错"""
-        with pytest.raises(ValidationError, match="must be a number"):
-            validate_cost("expensive", "test")
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            pytest.param(0.03, 0.03, id="valid"),
+            pytest.param(None, None, id="none"),
+            pytest.param(0, 0.0, id="zero"),
+        ],
+    )
+    def test_valid(self, value, expected):
+        """有效的成本（零成本有效），None应该返回None"""
+        assert validate_cost(value, "test") == expected
+
+    @pytest.mark.parametrize(
+        "value, message",
+        [
+            pytest.param(-0.01, "cannot be negative", id="negative"),
+            pytest.param(1001, "too large", id="too-large"),
+            pytest.param("expensive", "must be a number", id="non-numeric"),
+        ],
+    )
+    def test_invalid(self, value, message):
+        """无效的成本应该报错"""
+        with pytest.raises(ValidationError, match=message):
+            validate_cost(value, "test")
 
 
 class TestValidateSpecialties:
     """测试专长验证"""
 
-    def test_valid_specialties_list(self):
-        """有效的专长列表"""
-        result = validate_specialties(["code", "reasoning"])
-        assert result == ["code", "reasoning"]
-
-    def test_valid_specialties_string(self):
-        """有效的专长字符串"""
-        result = validate_specialties("code,reasoning,chat")
-        assert result == ["code", "reasoning", "chat"]
-
-    def test_none_specialties(self):
-        """None应该返回None"""
-        assert validate_specialties(None) is None
-
-    def test_empty_list(self):
-        """空列表应该返回None"""
-        assert validate_specialties([]) is None
-
-    def test_specialties_with_spaces(self):
-        """带空格的专长应该被trim"""
-        result = validate_specialties("  code  , reasoning ")
-        assert result == ["code", "reasoning"]
-
-    def test_invalid_specialty(self):
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            pytest.param(["code", "reasoning"], ["code", "reasoning"], id="list"),
+            pytest.param(
+                "code,reasoning,chat", ["code", "reasoning", "chat"], id="string"
+            ),
+            pytest.param(None, None, id="none"),
+            pytest.param([], None, id="empty-list"),
+            pytest.param(("code", "Reasoning"), ["code", "reasoning"], id="tuple"),
+            pytest.param((), None, id="empty-tuple"),
+            pytest.param("  code  , reasoning ", ["code", "reasoning"], id="trimmed"),
+            pytest.param(
+                ["CODE", "Reasoning"], ["code", "reasoning"], id="case-insensitive"
+            ),
+            pytest.param(
+                ["code", "code", "reasoning"], ["code", "reasoning"], id="deduplicated"
+            ),
+            pytest.param(
+                ["reasoning", "Code", "reasoning"],
+                ["reasoning", "code"],
+                id="dedup-keeps-order",
+            ),
+        ],
+    )
+    def test_valid(self, value, expected):
+        """有效的专长（列表或逗号分隔字符串）应该被规范化、去重"""
+        assert validate_specialties(value) == expected
+
+    @pytest.mark.parametrize(
+        "value, message",
+        [
+            pytest.param(["invalid_specialty"], "Invalid specialty", id="invalid"),
+            pytest.param([123], "must be a string", id="non-string-item"),
+            pytest.param(123, "must be a list", id="non-list"),
+        ],
+    )
+    def test_invalid(self, value, message):
         """无效的专长应该报错"""
-        with pytest.raises(ValidationError, match="Invalid specialty"):
-            validate_specialties(["invalid_specialty"])
-
-    def test_case_insensitive(self):
-        """专长应该不区分大小写"""
-        result = validate_specialties(["CODE", "Reasoning"])
-        assert result == ["code", "reasoning"]
-
-    def test_duplicate_specialties(self):
-        """重复的专长应该去重"""
-        result = validate_specialties(["code", "code", "reasoning"])
-        assert result == ["code", "reasoning"]
-
-    def test_non_string_specialty(self):
-        """非字符串专长应该报错"""
-        with pytest.raises(ValidationError, match="must be a string"):
-            validate_specialties([123])
-
-    def test_non_list_non_string(self):
-        """非列表非字符串应该报错"""
-        with pytest.raises(ValidationError, match="must be a list"):
-            validate_specialties(123)
+        with pytest.raises(ValidationError, match=message):
+            validate_specialties(value)
 
 
 class TestValidateUrl:
     """测试URL验证"""
 
-    def test_valid_https_url(self):
-        """有效的HTTPS URL"""
-        url = "https://api.openai.com/v1"
-        assert validate_url(url, "test") == url
-
-    def test_valid_http_url(self):
-        """有效的HTTP URL"""
-        url = "http://localhost:8080"
-        assert validate_url(url, "test") == url
-
-    def test_none_url(self):
-        """None应该返回None"""
-        assert validate_url(None, "test") is None
-
-    def test_empty_url(self):
-        """空URL应该返回None"""
-        assert validate_url("", "test") is None
-
-    def test_url_with_spaces(self):
-        """URL包含空格应该被trim"""
-        url = "  https://api.example.com  "
-        assert validate_url(url, "test") == "https://api.example.com"
-
-    def test_invalid_protocol(self):
-        """无效协议应该报错"""
-        with pytest.raises(ValidationError, match="must start with http"):
-            validate_url("ftp://example.com", "test")
-
-    def test_no_protocol(self):
-        """无协议应该报错"""
-        with pytest.raises(ValidationError, match="must start with http"):
-            validate_url("api.openai.com", "test")
-
-    def test_too_long_url(self):
-        """过长URL应该报错"""
-        with pytest.raises(ValidationError, match="too long"):
-            validate_url("https://" + "a" * 2048, "test")
-
-    def test_non_string_url(self):
-        """非字符串URL应该报错"""
-        with pytest.raises(ValidationError, match="must be a string"):
-            validate_url(123, "test")
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            pytest.param(
+                "https://api.openai.com/v1", "https://api.openai.com/v1", id="https"
+            ),
+            pytest.param("http://localhost:8080", "http://localhost:8080", id="http"),
+            pytest.param(None, None, id="none"),
+            pytest.param("", None, id="empty"),
+            pytest.param(
+                "  https://api.example.com  ", "https://api.example.com", id="trimmed"
+            ),
+        ],
+    )
+    def test_valid(self, value, expected):
+        """有效的URL（包含空格应该被trim），None/空URL应该返回None"""
+        assert validate_url(value, "test") == expected
+
+    @pytest.mark.parametrize(
+        "value, message",
+        [
+            pytest.param("ftp://example.com", "must start with http", id="ftp"),
+            pytest.param("api.openai.com", "must start with http", id="no-protocol"),
+            pytest.param("https://" + "a" * 2048, "too long", id="too-long"),
+            pytest.param(123, "must be a string", id="non-string"),
+        ],
+    )
+    def test_invalid(self, value, message):
+        """无效的URL应该报错"""
+        with pytest.raises(ValidationError, match=message):
+            validate_url(value, "test")
 
 
 class TestValidateString:
     """测试字符串验证"""
 
-    def test_valid_string(self):
-        """有效的字符串"""
-        assert validate_string("test value", "test") == "test value"
-
-    def test_none_string(self):
-        """None应该返回None"""
-        assert validate_string(None, "test") is None
-
-    def test_empty_string(self):
-        """空字符串应该返回None"""
-        assert validate_string("", "test") is None
-
-    def test_string_with_spaces(self):
-        """字符串包含空格应该被trim"""
-        assert validate_string("  test  ", "test") == "test"
-
-    def test_whitespace_only(self):
-        """仅空格应该返回None"""
-        assert validate_string("   ", "test") is None
-
-    def test_too_long_string(self):
-        """过长字符串应该报错"""
-        with pytest.raises(ValidationError, match="too long"):
-            validate_string("a" * 1001, "test", 1000)
-
-    def test_custom_max_length(self):
-        """自定义最大长度"""
-        validate_string("a" * 50, "test", 50)
-        with pytest.raises(ValidationError):
-            validate_string("a" * 51, "test", 50)
-
-    def test_non_string(self):
-        """非字符串应该报错"""
-        with pytest.raises(ValidationError, match="must be a string"):
-            validate_string(123, "test")
+    @pytest.mark.parametrize(
+        "value, max_length, expected",
+        [
+            pytest.param("test value", 1000, "test value", id="valid"),
+            pytest.param(None, 1000, None, id="none"),
+            pytest.param("", 1000, None, id="empty"),
+            pytest.param("  test  ", 1000, "test", id="trimmed"),
+            pytest.param("   ", 1000, None, id="whitespace-only"),
+            pytest.param("a" * 50, 50, "a" * 50, id="custom-max-length"),
+        ],
+    )
+    def test_valid(self, value, max_length, expected):
+        """有效的字符串（包含空格应该被trim），None/空白应该返回None"""
+        assert validate_string(value, "test", max_length) == expected
+
+    @pytest.mark.parametrize(
+        "value, max_length, message",
+        [
+            pytest.param("a" * 1001, 1000, "too long", id="too-long"),
+            pytest.param("a" * 51, 50, "too long", id="custom-max-length"),
+            pytest.param(123, 1000, "must be a string", id="non-string"),
+        ],
+    )
+    def test_invalid(self, value, max_length, message):
+        """无效的字符串应该报错"""
+        with pytest.raises(ValidationError, match=message):
+            validate_string(value, "test", max_length)
 
 
 class TestValidateModelData: